@@ -1,12 +1,18 @@
 import streamlit as st
 import streamlit.components.v1 as components
+import os
 import json
 import html
-import base64
-from datetime import datetime
-import uuid
-import qrcode
+import binascii
+from datetime import datetime, timedelta
+import secrets
+import string
+import threading
+import time
+import segno
 from io import BytesIO
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     from PIL import Image
@@ -39,34 +45,34 @@ st.set_page_config(
 @st.cache_resource
 def get_firebase_connection():
     """Firebase Firestore connection"""
-    import os
-    
     try:
-        # Check if already initialized
-        if not firebase_admin._apps:
-            initialized = False
+        # Already initialized (warm start / another session in this process) - no secrets or cert parsing
+        if firebase_admin._apps:
+            return firestore.client()
+        
+        initialized = False
+        
+        # Try Streamlit secrets first (for cloud deployment)
+        try:
+            if 'firebase' in st.secrets:
+                creds_dict = dict(st.secrets["firebase"])
+                cred = credentials.Certificate(creds_dict)
+                firebase_admin.initialize_app(cred)
+                initialized = True
+        except:
+            pass  # No secrets, try local file
+        
+        # Use local credentials file or path from env (e.g. Render Secret File)
+        if not initialized:
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            creds_path = os.environ.get("FIREBASE_CREDENTIALS_PATH") or os.path.join(script_dir, "firebase_credentials.json")
             
-            # Try Streamlit secrets first (for cloud deployment)
-            try:
-                if 'firebase' in st.secrets:
-                    creds_dict = dict(st.secrets["firebase"])
-                    cred = credentials.Certificate(creds_dict)
-                    firebase_admin.initialize_app(cred)
-                    initialized = True
-            except:
-                pass  # No secrets, try local file
+            if not os.path.exists(creds_path):
+                st.error(f"❌ firebase_credentials.json မတွေ့ပါ: {creds_path}")
+                return None
             
-            # Use local credentials file or path from env (e.g. Render Secret File)
-            if not initialized:
-                script_dir = os.path.dirname(os.path.abspath(__file__))
-                creds_path = os.environ.get("FIREBASE_CREDENTIALS_PATH") or os.path.join(script_dir, "firebase_credentials.json")
-                
-                if not os.path.exists(creds_path):
-                    st.error(f"❌ firebase_credentials.json မတွေ့ပါ: {creds_path}")
-                    return None
-                
-                cred = credentials.Certificate(creds_path)
-                firebase_admin.initialize_app(cred)
+            cred = credentials.Certificate(creds_path)
+            firebase_admin.initialize_app(cred)
         
         db = firestore.client()
         return db
@@ -77,67 +83,169 @@ def get_firebase_connection():
 # ============================================
 # DATA FUNCTIONS - Much faster with Firebase!
 # ============================================
-@st.cache_data(ttl=30)
-def load_stores(_db_id):
-    """Load all stores"""
-    db = firestore.client()
-    stores = []
+def _store_from_doc(doc):
+    """Store doc -> dict (header အတွက် escape လုပ်ပြီးသား name/subtitle ပါ)"""
+    data = doc.to_dict()
+    data['store_id'] = doc.id
+    data['store_name_html'] = html.escape(data.get('store_name', ''))
+    data['subtitle_html'] = html.escape(data.get('subtitle', 'Food & Drinks'))
+    return data
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_stores():
+    """Load all stores with a collection read (listener မရှိ/မရသေးရင် fallback)"""
+    db = get_firebase_connection()
     docs = db.collection('stores').stream()
-    for doc in docs:
-        data = doc.to_dict()
-        data['store_id'] = doc.id
-        stores.append(data)
-    return stores
+    return [_store_from_doc(doc) for doc in docs]
+
+def load_stores():
+    """Load all stores - live listener snapshot, polling read fallback"""
+    state = _stores_watch_state()
+    with state['lock']:
+        stores = state['stores'] if _stores_listener_live(state) else None
+    if stores is None:
+        return _fetch_stores()
+    return [dict(s) for s in stores]  # session တွေ share တဲ့ snapshot ကို caller က မပြင်မိအောင်
 
-@st.cache_data(ttl=30)
-def load_categories(_db_id, store_id):
+@st.cache_data(ttl=60, show_spinner=False)
+def _store_indexes(stores_version=None):
+    """(names, by_name, by_id) for the store selectbox - rerun တိုင်း dict ပြန်မဆောက်အောင်
+    stores_version: listener snapshot ပြောင်းတိုင်း cache key ပြောင်းအောင်"""
+    stores = load_stores()
+    by_name = {s['store_name']: s for s in stores}
+    return list(by_name), by_name, {s['store_id']: s for s in stores}
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_categories(store_id):
     """Load categories for a store"""
-    db = firestore.client()
+    db = get_firebase_connection()
     categories = []
     docs = db.collection('stores').document(store_id).collection('categories').stream()
     for doc in docs:
         data = doc.to_dict()
         data['id'] = doc.id
+        data['category_name_html'] = html.escape(data.get('category_name', ''))
         categories.append(data)
     return categories
 
-@st.cache_data(ttl=30)
-def load_menu_items(_db_id, store_id):
+@st.cache_data(ttl=60, show_spinner=False)
+def load_menu_items(store_id):
     """Load menu items for a store"""
-    db = firestore.client()
+    db = get_firebase_connection()
     items = []
     docs = db.collection('stores').document(store_id).collection('menu_items').stream()
     for doc in docs:
         data = doc.to_dict()
         data['item_id'] = doc.id
+        # Display-ready (escaped) copies - cache ထဲမှာ တစ်ခါပဲ escape
+        data['name_html'] = html.escape(data.get('name', ''))
+        data['price_html'] = html.escape(str(data.get('price', '')))
         items.append(data)
     return items
 
-@st.cache_data(ttl=5)  # Very short cache for real-time orders
-def load_orders(_db_id, store_id):
-    """Load orders for a store"""
-    db = firestore.client()
+ORDERS_LOAD_LIMIT = 200  # Dashboard က နောက်ဆုံး order တွေပဲ ပြ - cache/bandwidth မကြီးထွားအောင်
+
+@st.cache_data(ttl=8, show_spinner=False)  # Short TTL - polling sessions တွေ TTL တစ်ခုမှာ read တစ်ခါပဲ မျှသုံး
+def load_orders(store_id):
+    """Load most recent orders for a store"""
+    db = get_firebase_connection()
+    docs = db.collection('stores').document(store_id).collection('orders').order_by('timestamp', direction=firestore.Query.DESCENDING).limit(ORDERS_LOAD_LIMIT).stream()
     orders = []
-    docs = db.collection('stores').document(store_id).collection('orders').order_by('timestamp', direction=firestore.Query.DESCENDING).stream()
     for doc in docs:
-        data = doc.to_dict()
-        data['order_id'] = doc.id
-        orders.append(data)
+        order = doc.to_dict()
+        order['order_id'] = doc.id
+        # total က string အဖြစ် သိမ်းထား - load တုန်းက တစ်ခါပဲ int ပြောင်း (parse မရရင် None)
+        order['total_int'] = _to_int(order.get('total'))
+        order['display_total_int'] = _to_int(order.get('adjusted_total') or order.get('total'))
+        orders.append(order)
     return orders
 
+@st.cache_data(ttl=8, show_spinner=False)
+def count_completed_orders(store_id):
+    """Completed order အရေအတွက် (load_orders ရဲ့ limit မပါ) - server-side count aggregation"""
+    db = get_firebase_connection()
+    query = db.collection('stores').document(store_id).collection('orders').where(
+        filter=firestore.FieldFilter('status', '==', 'completed'))
+    return query.count().get()[0][0].value
+
+def _to_int(value):
+    """int(value), or None if it can't be parsed"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def index_categories(categories):
+    """(cat_names, cat_by_name) - categories ကို တစ်ခါပဲ ပတ်"""
+    cat_names = []
+    cat_by_name = {}
+    for c in categories:
+        name = c['category_name']
+        cat_names.append(name)
+        cat_by_name[name] = c
+    return cat_names, cat_by_name
+
+def bucket_orders(orders, today=None):
+    """(pending, preparing, completed, active, today_completed) - orders ကို တစ်ခါပဲ ပတ်
+    active = pending + preparing (load_orders ရဲ့ timestamp desc အစီအစဉ် မပျက်)
+    today_completed = today ("YYYY-MM-DD") ပေးမှ ဖြည့်"""
+    pending_orders, preparing_orders, completed_orders, active_orders, today_completed = [], [], [], [], []
+    for o in orders:
+        status = o.get('status')
+        if status == 'pending':
+            pending_orders.append(o)
+            active_orders.append(o)
+        elif status == 'preparing':
+            preparing_orders.append(o)
+            active_orders.append(o)
+        elif status == 'completed':
+            completed_orders.append(o)
+            if today and o.get('timestamp', '').startswith(today):
+                today_completed.append(o)
+    return pending_orders, preparing_orders, completed_orders, active_orders, today_completed
+
+def clear_stores_cache():
+    _fetch_stores.clear()
+    _store_indexes.clear()
+
 def clear_all_cache():
-    load_stores.clear()
+    clear_stores_cache()
     load_categories.clear()
     load_menu_items.clear()
     load_orders.clear()
 
+# ============================================
+# BATCH HELPERS
+# ============================================
+FIRESTORE_BATCH_LIMIT = 500  # Firestore WriteBatch တစ်ခုမှာ operation ၅၀၀ အထိပဲ
+
+def _batch_delete(db, refs):
+    """Delete document references with WriteBatch commits (500 per batch). Returns deleted count."""
+    batch = db.batch()
+    pending = 0
+    deleted = 0
+    for ref in refs:
+        batch.delete(ref)
+        pending += 1
+        if pending == FIRESTORE_BATCH_LIMIT:
+            batch.commit()
+            deleted += pending
+            batch = db.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+        deleted += pending
+    return deleted
+
 # ============================================
 # STORE FUNCTIONS
 # ============================================
-def save_store(db, store_data):
-    """Save new store"""
+def save_store(db, store_data, seed_categories=None):
+    """Save new store (+ optional starting categories) in one batch commit"""
     store_id = store_data['store_id']
-    db.collection('stores').document(store_id).set({
+    store_ref = db.collection('stores').document(store_id)
+    batch = db.batch()
+    batch.set(store_ref, {
         'store_name': store_data['store_name'],
         'admin_key': store_data['admin_key'],
         'logo': store_data.get('logo', '☕'),
@@ -148,6 +256,12 @@ def save_store(db, store_data):
         'active': store_data.get('active', True),
         'created_at': firestore.SERVER_TIMESTAMP
     })
+    for category_name in (seed_categories or []):
+        batch.set(store_ref.collection('categories').document(), {
+            'category_name': category_name,
+            'created_at': firestore.SERVER_TIMESTAMP
+        })
+    _commit_stores_write(batch)
     clear_all_cache()
 
 def update_store(db, store_id, new_data):
@@ -169,21 +283,28 @@ def update_store(db, store_id, new_data):
                 'table_number_format'):
         if key in new_data:
             upd[key] = new_data[key]
-    db.collection('stores').document(store_id).update(upd)
+    batch = db.batch()
+    batch.update(db.collection('stores').document(store_id), upd)
+    _commit_stores_write(batch)
     clear_all_cache()
 
 def delete_store(db, store_id):
     """Delete store and all subcollections"""
     store_ref = db.collection('stores').document(store_id)
     
-    # Delete subcollections
-    for subcoll in ['categories', 'menu_items', 'orders']:
-        docs = store_ref.collection(subcoll).stream()
-        for doc in docs:
-            doc.reference.delete()
+    # Delete subcollections - independent scans, so overlap their network I/O
+    def _wipe(subcoll):
+        docs = store_ref.collection(subcoll).select([]).stream()
+        return _batch_delete(db, (doc.reference for doc in docs))
+    
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        list(ex.map(_wipe, ['categories', 'menu_items', 'orders']))
+    unwatch_orders(store_id)
     
     # Delete store document
-    store_ref.delete()
+    batch = db.batch()
+    batch.delete(store_ref)
+    _commit_stores_write(batch)
     clear_all_cache()
 
 # ============================================
@@ -195,26 +316,26 @@ def save_category(db, store_id, category_name):
         'category_name': category_name,
         'created_at': firestore.SERVER_TIMESTAMP
     })
-    load_categories.clear()
+    load_categories.clear(store_id)  # ဒီ store entry ပဲ ဖျက်
 
 def delete_category(db, store_id, category_id):
     """Delete category"""
     db.collection('stores').document(store_id).collection('categories').document(category_id).delete()
-    load_categories.clear()
+    load_categories.clear(store_id)
 
 # ============================================
 # MENU ITEM FUNCTIONS
 # ============================================
 def save_menu_item(db, store_id, item_data):
     """Save new menu item"""
-    item_id = str(uuid.uuid4())[:8]
+    item_id = secrets.token_hex(4)
     db.collection('stores').document(store_id).collection('menu_items').document(item_id).set({
         'name': item_data['name'],
         'price': item_data['price'],
         'category': item_data['category'],
         'created_at': firestore.SERVER_TIMESTAMP
     })
-    load_menu_items.clear()
+    load_menu_items.clear(store_id)
 
 def update_menu_item(db, store_id, item_id, new_data):
     """Update menu item"""
@@ -223,19 +344,172 @@ def update_menu_item(db, store_id, item_id, new_data):
         'price': new_data['price'],
         'category': new_data['category']
     })
-    load_menu_items.clear()
+    load_menu_items.clear(store_id)
 
 def delete_menu_item(db, store_id, item_id):
     """Delete menu item"""
     db.collection('stores').document(store_id).collection('menu_items').document(item_id).delete()
-    load_menu_items.clear()
+    load_menu_items.clear(store_id)
+
+# ============================================
+# REAL-TIME LISTENERS
+# ============================================
+@st.cache_resource
+def _stores_watch_state():
+    """Process-wide 'stores' collection listener - load_stores() ကို rerun တိုင်း read မလုပ်ရအောင်
+    writes: ကိုယ့် store write ဘယ်နှခု သွားနေလဲ၊ fresh_after: ဒီ commit_time ထက် နောက်ကျတဲ့ snapshot မှ ယုံ"""
+    state = {'lock': threading.Lock(), 'stores': None, 'read_time': None, 'version': 0,
+             'writes': 0, 'fresh_after': None, 'stale_version': -1, 'watch': None}
+    db = get_firebase_connection()
+    if db is None:
+        return state
+    
+    def _on_snapshot(col_snapshot, changes, read_time):
+        stores = [_store_from_doc(doc) for doc in col_snapshot]
+        with state['lock']:
+            state['stores'] = stores
+            state['read_time'] = read_time
+            state['version'] += 1
+    
+    try:
+        # ပထမ snapshot ကို မစောင့် - မရောက်ခင် load_stores က polling read နဲ့ သွား
+        state['watch'] = db.collection('stores').on_snapshot(_on_snapshot)
+    except Exception:
+        state['watch'] = None
+    return state
+
+def _watch_alive(watch):
+    """Listener အလုပ်လုပ်နေလား - မသိရင် False (polling ကို ပြန်သုံး)"""
+    if watch is None:
+        return False
+    active = getattr(watch, 'is_active', None)
+    if callable(active):
+        active = active()
+    if active is None:
+        closed = getattr(watch, '_closed', None)
+        return closed is False
+    return bool(active)
+
+def _stores_listener_live(state):
+    """Snapshot ကို ယုံလို့ရလား - listener ရပ်သွားရင် (သို့) ကိုယ့် write ပါတဲ့ snapshot မရောက်သေးရင် False"""
+    if state['stores'] is None or state['writes'] or state['version'] <= state['stale_version']:
+        return False
+    if state['fresh_after'] is not None and (state['read_time'] is None or state['read_time'] < state['fresh_after']):
+        return False
+    return _watch_alive(state['watch'])
+
+def _stores_version():
+    """Listener snapshot version (polling ဖြစ်နေရင် None)"""
+    state = _stores_watch_state()
+    with state['lock']:
+        return state['version'] if _stores_listener_live(state) else None
+
+def _commit_stores_write(batch):
+    """Store write ကို commit - commit မပြီးမချင်း + commit_time ပါတဲ့ snapshot မရောက်မချင်း load_stores က fresh read သုံး"""
+    state = _stores_watch_state()
+    with state['lock']:
+        state['writes'] += 1
+    commit_time = None
+    try:
+        batch.commit()
+        commit_time = getattr(batch, 'commit_time', None)
+    finally:
+        with state['lock']:
+            state['writes'] -= 1
+            if commit_time is None:
+                state['stale_version'] = state['version']  # commit time မသိ - နောက် snapshot အသစ်ကိုပဲ ယုံ
+            elif state['fresh_after'] is None or commit_time > state['fresh_after']:
+                state['fresh_after'] = commit_time
+
+MAX_ORDER_WATCHES = 200  # process တစ်ခုလုံးမှာ customer order listener အများဆုံး
+ORDER_WATCH_IDLE_SECONDS = 30 * 60  # customer rerun မလာတော့တာ ဒီလောက်ကြာရင် listener ဖြုတ် (ထွက်သွားပြီ)
+
+@st.cache_resource
+def _order_watch_state():
+    """Process-wide order snapshot listeners - survive reruns, shared by all sessions
+    watches: key -> [watch, last_used] (last_used အဟောင်းဆုံးက ရှေ့ဆုံး - LRU)"""
+    return {'lock': threading.Lock(), 'watches': {}, 'docs': {}}
+
+def _evict_order_watches(state, now):
+    """Idle ဖြစ်နေတာ + cap ကျော်နေတာကို ဖယ် (lock ယူထားပြီးမှ ခေါ်) - unsubscribe ရမယ့် watch တွေ ပြန်ပေး"""
+    evicted = []
+    for key, (watch, last_used) in list(state['watches'].items()):
+        if now - last_used < ORDER_WATCH_IDLE_SECONDS and len(state['watches']) < MAX_ORDER_WATCHES:
+            break
+        del state['watches'][key]
+        state['docs'].pop(key, None)
+        if watch is not None:
+            evicted.append(watch)
+    return evicted
+
+def watch_order(db, store_id, order_id):
+    """Keep a customer's order doc up to date via on_snapshot instead of polling reads.
+    Rerun တိုင်း ခေါ်ရင် last_used တိုး။ Returns False (caller keeps point reads) when the listener can't be started."""
+    state = _order_watch_state()
+    key = (store_id, order_id)
+    now = time.monotonic()
+    with state['lock']:
+        entry = state['watches'].pop(key, None)
+        if entry is not None:
+            entry[1] = now
+            state['watches'][key] = entry  # LRU - နောက်ဆုံးသုံးတာ အနောက်ဆုံး
+            return True
+        evicted = _evict_order_watches(state, now)
+        state['watches'][key] = [None, now]  # reserve before the network call
+    for old in evicted:
+        old.unsubscribe()
+    
+    def _on_snapshot(doc_snapshots, changes, read_time):
+        snap = doc_snapshots[0] if doc_snapshots else None
+        with state['lock']:
+            if key not in state['watches']:
+                return
+            if snap is not None and snap.exists:
+                state['docs'][key] = snap.to_dict()
+            else:
+                state['docs'].pop(key, None)  # doc မရှိ(သေး) - get_order_doc က point read နဲ့ စစ်
+    
+    try:
+        watch = db.collection('stores').document(store_id).collection('orders').document(order_id).on_snapshot(_on_snapshot)
+    except Exception:
+        with state['lock']:
+            state['watches'].pop(key, None)
+        return False
+    with state['lock']:
+        if key in state['watches']:
+            state['watches'][key][0] = watch
+            return True
+    watch.unsubscribe()  # unwatched while we were connecting
+    return False
+
+def unwatch_order(store_id, order_id):
+    """Stop the order listener (order finished / customer left)"""
+    unwatch_orders(store_id, [order_id])
+
+def unwatch_orders(store_id, order_ids=None):
+    """Stop listeners for these orders (order_ids=None - ဆိုင်တစ်ခုလုံးရဲ့ order အားလုံး)"""
+    state = _order_watch_state()
+    watches = []
+    with state['lock']:
+        if order_ids is None:
+            keys = [k for k in state['watches'] if k[0] == store_id]
+        else:
+            keys = [(store_id, oid) for oid in order_ids]
+        for key in keys:
+            entry = state['watches'].pop(key, None)
+            state['docs'].pop(key, None)
+            if entry is not None and entry[0] is not None:
+                watches.append(entry[0])
+    for watch in watches:
+        watch.unsubscribe()
 
 # ============================================
 # ORDER FUNCTIONS
 # ============================================
-def save_order(db, store_id, order_data):
-    """Save new order - Very fast with Firebase!"""
-    order_id = str(uuid.uuid4())[:8]
+def save_order(db, store_id, order_data, order_id=None):
+    """Save new order - Very fast with Firebase!
+    order_id: caller က ကြိုထုတ်ထားရင် (background write) အဲဒါကို သုံး"""
+    order_id = order_id or secrets.token_hex(4)
     db.collection('stores').document(store_id).collection('orders').document(order_id).set({
         'table_no': order_data['table_no'],
         'items': order_data['items'],
@@ -246,6 +520,17 @@ def save_order(db, store_id, order_data):
     load_orders.clear()
     return order_id
 
+@st.cache_resource
+def _order_write_executor():
+    """Process-wide pool for background order writes (customer က Firestore RTT ကို မစောင့်ရ)"""
+    return ThreadPoolExecutor(max_workers=4)
+
+def save_order_async(db, store_id, order_data):
+    """(order_id, future) - id ကို ဒီမှာ ထုတ်ပြီး write ကို background မှာ လုပ်"""
+    order_id = secrets.token_hex(4)
+    future = _order_write_executor().submit(save_order, db, store_id, order_data, order_id)
+    return order_id, future
+
 def update_order_status(db, store_id, order_id, new_status):
     """Update order status"""
     db.collection('stores').document(store_id).collection('orders').document(order_id).update({
@@ -262,6 +547,12 @@ def get_order_status(db, store_id, order_id):
 
 def get_order_doc(db, store_id, order_id):
     """Get full order document for customer (status + unavailable_items message)"""
+    # Listener ရှိရင် snapshot ကိုပဲ ဖတ် - Firestore read မလုပ်
+    state = _order_watch_state()
+    with state['lock']:
+        cached = state['docs'].get((store_id, order_id))
+        if cached is not None:
+            return dict(cached)
     doc = db.collection('stores').document(store_id).collection('orders').document(order_id).get()
     if doc.exists:
         return doc.to_dict()
@@ -311,32 +602,43 @@ def compute_adjusted_total(order_total_int, menu_items, unavailable_item_names_w
     adjusted = max(0, order_total_int - subtract)
     return adjusted, subtract
 
-def delete_order(db, store_id, order_id):
-    """Delete completed order"""
-    db.collection('stores').document(store_id).collection('orders').document(order_id).delete()
+def delete_orders_batch(db, store_id, order_ids):
+    """Delete many orders with batched writes (500 ခုတစ်ခါ commit) - order တစ်ခုချင်း round trip မလုပ်"""
+    orders_ref = db.collection('stores').document(store_id).collection('orders')
+    deleted = _batch_delete(db, (orders_ref.document(oid) for oid in order_ids))
     load_orders.clear()
+    count_completed_orders.clear(store_id)
+    unwatch_orders(store_id, order_ids)
+    return deleted
+
+def _daily_sales_increment(amount, today):
+    """Merge payload that adds one order of `amount` to a daily_sales doc"""
+    return {
+        'total': firestore.Increment(amount),
+        'order_count': firestore.Increment(1),
+        'date': today
+    }
 
-def add_to_daily_sales(db, store_id, amount):
-    """Add amount to daily sales total"""
+def complete_order(db, store_id, order_id, amount=None):
+    """Mark order completed and add amount to daily sales in one WriteBatch commit"""
     today = datetime.now().strftime("%Y-%m-%d")
-    doc_ref = db.collection('stores').document(store_id).collection('daily_sales').document(today)
-    
-    doc = doc_ref.get()
-    if doc.exists:
-        data = doc.to_dict()
-        current_total = data.get('total', 0)
-        current_count = data.get('order_count', 0)
-        doc_ref.update({
-            'total': current_total + amount,
-            'order_count': current_count + 1
-        })
-    else:
-        doc_ref.set({
-            'total': amount,
-            'order_count': 1,
-            'date': today,
-            'created_at': firestore.SERVER_TIMESTAMP
-        })
+    store_ref = db.collection('stores').document(store_id)
+    batch = db.batch()
+    batch.update(store_ref.collection('orders').document(order_id), {'status': 'completed'})
+    if amount is not None:
+        batch.set(store_ref.collection('daily_sales').document(today), _daily_sales_increment(amount, today), merge=True)
+    batch.commit()
+    load_orders.clear()
+    count_completed_orders.clear(store_id)
+    if amount is not None:
+        load_daily_sales_history.clear()
+    unwatch_order(store_id, order_id)
+
+def delete_completed_orders(db, store_id):
+    """Completed order အားလုံး ဖျက် (load_orders ရဲ့ နောက်ဆုံး ၂၀၀ တင်မက) - id ပဲ ဆွဲ"""
+    docs = db.collection('stores').document(store_id).collection('orders').where(
+        filter=firestore.FieldFilter('status', '==', 'completed')).select([]).stream()
+    return delete_orders_batch(db, store_id, [doc.id for doc in docs])
 
 def get_daily_sales(db, store_id):
     """Get today's sales total and order count"""
@@ -353,35 +655,35 @@ def get_daily_sales(db, store_id):
 def clear_all_daily_sales(db, store_id):
     """နေ့စဉ်ရောင်းရငွေ အားလုံး ဖျက် (စမ်းသပ်အတွက်)"""
     ref = db.collection('stores').document(store_id).collection('daily_sales')
-    deleted = 0
-    for doc in ref.stream():
-        doc.reference.delete()
-        deleted += 1
+    deleted = _batch_delete(db, (doc.reference for doc in ref.select([]).stream()))
+    load_daily_sales_history.clear()
     return deleted
 
 
-def load_daily_sales_history(db, store_id, last_n_days=365):
-    """နေ့စဉ်ရောင်းရငွေ စာရင်း - ရက်စွဲ၊ တန်ဖိုး၊ order အရေအတွက်။ last_n_days=1 ဆိုရင် ယနေ့တစ်ရက်တည်း"""
-    from datetime import timedelta
-    today = datetime.now().strftime("%Y-%m-%d")
+@st.cache_data(ttl=30, show_spinner=False)
+def load_daily_sales_history(_db, store_id, last_n_days=365, today=None):
+    """နေ့စဉ်ရောင်းရငွေ စာရင်း - ရက်စွဲ၊ တန်ဖိုး၊ order အရေအတွက်။ last_n_days=1 ဆိုရင် ယနေ့တစ်ရက်တည်း
+    (_db - cache key ထဲ မပါ၊ store_id + last_n_days + today နဲ့ပဲ cache - ရက်ပြောင်းရင် key ပါပြောင်း)"""
+    now = datetime.strptime(today, "%Y-%m-%d") if today else datetime.now()
+    today = now.strftime("%Y-%m-%d")
     if last_n_days == 1:
         # ယနေ့ ရွေးရင် ယနေ့တစ်ရက်ပဲ
         cutoff_start = today
         cutoff_end = today
     else:
-        cutoff_start = (datetime.now() - timedelta(days=last_n_days)).strftime("%Y-%m-%d")
+        cutoff_start = (now - timedelta(days=last_n_days)).strftime("%Y-%m-%d")
         cutoff_end = today
-    ref = db.collection('stores').document(store_id).collection('daily_sales')
-    docs = ref.stream()
+    ref = _db.collection('stores').document(store_id).collection('daily_sales')
+    # Document ID is the date - range ကို server-side စစ် (collection တစ်ခုလုံး မဆွဲ)
+    docs = ref.where(
+        filter=firestore.FieldFilter(firestore.FieldPath.document_id(), '>=', ref.document(cutoff_start))
+    ).where(
+        filter=firestore.FieldFilter(firestore.FieldPath.document_id(), '<=', ref.document(cutoff_end))
+    ).stream()
     out = []
     for doc in docs:
-        if cutoff_start <= doc.id <= cutoff_end:
-            d = doc.to_dict()
-            out.append({
-                'date': doc.id,
-                'total': d.get('total', 0),
-                'order_count': d.get('order_count', 0)
-            })
+        d = doc.to_dict()
+        out.append({'date': doc.id, 'total': d.get('total', 0), 'order_count': d.get('order_count', 0)})
     out.sort(key=lambda x: x['date'], reverse=True)
     return out
 
@@ -389,72 +691,61 @@ def load_daily_sales_history(db, store_id, last_n_days=365):
 # ============================================
 # AUTO CLEANUP FUNCTIONS
 # ============================================
-def auto_cleanup_completed_orders(db, store_id):
+def auto_cleanup_completed_orders(db, store_id, today=None):
     """Auto delete completed orders from previous days (keep today's only)"""
-    today = datetime.now().strftime("%Y-%m-%d")
+    today = today or datetime.now().strftime("%Y-%m-%d")
     orders_ref = db.collection('stores').document(store_id).collection('orders')
     
-    # Get all completed orders
-    completed_orders = orders_ref.where('status', '==', 'completed').stream()
+    # Get all completed orders - only the timestamp field is needed
+    completed_orders = orders_ref.where(
+        filter=firestore.FieldFilter('status', '==', 'completed')
+    ).select(['timestamp']).stream()
     
-    deleted_count = 0
-    for order in completed_orders:
-        order_data = order.to_dict()
-        order_timestamp = order_data.get('timestamp', '')
-        
-        # Check if order is from previous day (not today)
-        if order_timestamp and not order_timestamp.startswith(today):
-            order.reference.delete()
-            deleted_count += 1
+    def _from_previous_day(order):
+        order_timestamp = (order.to_dict() or {}).get('timestamp', '')
+        return order_timestamp and not order_timestamp.startswith(today)
+    
+    # Check if order is from previous day (not today)
+    old_refs = [o.reference for o in completed_orders if _from_previous_day(o)]
+    deleted_count = _batch_delete(db, old_refs)
     
     if deleted_count > 0:
         load_orders.clear()
+        unwatch_orders(store_id, [ref.id for ref in old_refs])
     
     return deleted_count
 
-def auto_cleanup_old_daily_sales(db, store_id):
+def auto_cleanup_old_daily_sales(db, store_id, today=None):
     """Auto delete daily_sales older than 400 days (တစ်နှစ်ထက် ရှေးကျတာပဲ ဖျက် - နေ့စဉ်ရောင်းရငွေ ၁နှစ်ပြမယ်)"""
-    from datetime import timedelta
-    
-    cutoff_date = (datetime.now() - timedelta(days=400)).strftime("%Y-%m-%d")
+    now = datetime.strptime(today, "%Y-%m-%d") if today else datetime.now()
+    cutoff_date = (now - timedelta(days=400)).strftime("%Y-%m-%d")
     
     daily_sales_ref = db.collection('stores').document(store_id).collection('daily_sales')
     
-    # Get all daily_sales documents
-    all_sales = daily_sales_ref.stream()
-    
-    deleted_count = 0
-    for sale in all_sales:
-        sale_date = sale.id  # Document ID is the date (e.g., "2026-01-01")
-        
-        if sale_date < cutoff_date:
-            sale.reference.delete()
-            deleted_count += 1
+    # Document ID is the date (e.g., "2026-01-01") - filter on it server-side, names only
+    old_sales = daily_sales_ref.where(
+        filter=firestore.FieldFilter(firestore.FieldPath.document_id(), '<', daily_sales_ref.document(cutoff_date))
+    ).select([]).stream()
     
-    return deleted_count
+    return _batch_delete(db, (sale.reference for sale in old_sales))
 
-def run_auto_cleanup(db, store_id):
-    """Run all auto cleanup tasks"""
-    orders_deleted = auto_cleanup_completed_orders(db, store_id)
-    sales_deleted = auto_cleanup_old_daily_sales(db, store_id)
-    return orders_deleted, sales_deleted
+def run_auto_cleanup(db, store_id, today=None):
+    """Run all auto cleanup tasks (independent collections - scans/deletes overlap)"""
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        orders_future = ex.submit(auto_cleanup_completed_orders, db, store_id, today)
+        sales_future = ex.submit(auto_cleanup_old_daily_sales, db, store_id, today)
+        return orders_future.result(), sales_future.result()
 
 # ============================================
 # HELPER FUNCTIONS
 # ============================================
+_DIGIT_TRANS = str.maketrans('၀၁၂၃၄၅၆၇၈၉', '0123456789')  # မြန်မာဂဏန်း -> English
+
 def parse_price(price_str):
     """Convert price string to number for calculation"""
-    myanmar_digits = '၀၁၂၃၄၅၆၇၈၉'
-    english_digits = '0123456789'
-    
-    result = str(price_str)
-    for m, e in zip(myanmar_digits, english_digits):
-        result = result.replace(m, e)
-    
-    try:
-        return int(''.join(filter(str.isdigit, result)))
-    except:
-        return 0
+    result = str(price_str).translate(_DIGIT_TRANS)
+    digits = ''.join(filter(str.isdigit, result))
+    return int(digits) if digits else 0
 
 
 def format_price(price):
@@ -462,6 +753,187 @@ def format_price(price):
     return f"{price:,}"
 
 
+# Menu/cart item row: name ....... price (.item-row CSS က menu view <style> ထဲမှာ)
+ITEM_ROW_HTML = (
+    '<div class="item-row"><span class="item-name">{name}</span>'
+    '<span class="item-dots"></span><span class="item-price">{price} Ks</span></div>'
+)
+
+# Counter dashboard active order card - markdown ၅ ခုအစား element တစ်ခု (တန်ဖိုးတွေ escape ပြီးမှ ထည့်)
+ORDER_CARD_HTML = (
+    '<div class="oc-title">{emoji} Order #{order_id}</div>'
+    '<div class="oc-table">🪑 Table: {table_no}</div>'
+    '<div class="oc-line"><b>📝 Items:</b> {items}</div>'
+    '<div class="oc-line"><b>💰 Total:</b> {total} Ks{adjusted_note}</div>'
+    '<div class="oc-time">🕐 {timestamp}</div>'
+)
+
+# Counter Dashboard order card CSS (.oc-*) - ORDER_CARD_HTML နဲ့ တွဲသုံး
+ORDER_CARD_CSS = """
+<style>
+.oc-title { font-size: 1.5em; font-weight: 700; margin-bottom: 6px; }
+.oc-table { font-weight: 700; margin-bottom: 4px; }
+.oc-line { margin-bottom: 4px; }
+.oc-time { color: #808495; font-size: 0.875em; }
+</style>
+"""
+
+
+# Cart ထဲက ➖/➕/Cancel နဲ့ Cart/Order ခလုတ်တွေကို parent document မှာ style ပေး
+# Content မပြောင်းလို့ Streamlit က iframe ကို ပြန်သုံး - script တစ်ခါပဲ run ပြီး MutationObserver နဲ့ ခလုတ်အသစ်တွေ လိုက်ပြင်
+QTY_BUTTON_STYLER_HTML = """
+<script>
+    // Button inline style - property တစ်ခုချင်း setProperty အစား cssText တစ်ခါတည်း ရေး
+    // role -> [button cssText, label <p> cssText] (တူတဲ့ အပိုင်းတွေ မျှသုံး)
+    var GREY_CSS = 'background:#f0f2f6!important;color:#333!important;';
+    var SMALL_CSS = GREY_CSS + 'border:1px solid #ccc!important;border-radius:12px!important;min-height:48px!important;min-width:50px!important;';
+    var PILL_CSS = 'border:2px solid #333!important;border-radius:25px!important;padding:12px 25px!important;min-width:160px!important;min-height:50px!important;font-weight:bold!important;';
+    var DARK_P_CSS = 'font-weight:bold!important;color:#333!important;';
+    var ROLE_CSS = {
+        qty: [SMALL_CSS + 'font-size:18px!important;', null],  // ➖ ➕ - no color (default/light grey)
+        cancel: [SMALL_CSS + 'font-size:16px!important;font-weight:bold!important;margin-left:8px!important;', DARK_P_CSS],  // Cancel - bold text
+        cart: [GREY_CSS + PILL_CSS, DARK_P_CSS],  // Cart - fully rounded, own border
+        order: ['background:linear-gradient(90deg, #2E8B57 0%, #9ACD32 100%)!important;color:white!important;' + PILL_CSS,
+                'font-weight:bold!important;color:white!important;']  // Order - fully rounded, own border
+    };
+
+    // Streamlit widget key (element container ရဲ့ st-key-<key> class) -> data-qr-role
+    // Button စာသား (textContent) ကို မဖတ်ဘဲ key နဲ့ပဲ ခွဲ
+    var KEY_ROLES = [
+        ['st-key-minus_', 'qty'],
+        ['st-key-plus_', 'qty'],
+        ['st-key-remove_', 'cancel'],
+        ['st-key-cart_clear_btn', 'cart'],
+        ['st-key-order_submit_btn', 'order']
+    ];
+
+    // st-key-* class မထုတ်တဲ့ Streamlit အဟောင်းအတွက် fallback - button စာသားနဲ့ ခွဲ
+    var LABEL_ROLES = [
+        ['➖', 'qty'],
+        ['➕', 'qty'],
+        ['Cancel', 'cancel'],
+        ['Cart', 'cart'],
+        ['Order', 'order']
+    ];
+
+    function roleOf(btn, byKey) {
+        var hay, table;
+        if (byKey) {
+            var box = btn.closest('[class*="st-key-"]');
+            hay = box ? box.className : '';
+            table = KEY_ROLES;
+        } else {
+            hay = btn.textContent || '';
+            table = LABEL_ROLES;
+        }
+        for (var i = 0; i < table.length; i++) {
+            if (hay.indexOf(table[i][0]) !== -1) return table[i][1];
+        }
+        return '';
+    }
+
+    // Keyed button တွေကို pass တစ်ခုတည်းနဲ့ ပတ် - မစစ်ရသေးတာကိုပဲ (button တစ်ခု = တစ်ခါ)
+    function styleQtyButtons() {
+        var doc = parentDoc();
+        if (!doc) return;
+
+        var byKey = !!doc.querySelector('[class*="st-key-"]');
+        var sel = byKey ? '[class*="st-key-"] button:not([data-qr-styled])' : 'button:not([data-qr-styled])';
+        doc.querySelectorAll(sel).forEach(function(btn) {
+            btn.dataset.qrStyled = '1';
+            var role = roleOf(btn, byKey);
+            var css = ROLE_CSS[role];
+            if (!css) return;
+            btn.dataset.qrRole = role;
+            btn.style.cssText = css[0];
+            if (css[1]) {
+                var pTag = btn.getElementsByTagName('p')[0];  // label <p> - selector engine မသုံး
+                if (pTag) pTag.style.cssText = css[1];
+            }
+        });
+    }
+
+    // ➖/➕/Cancel နှိပ်တာနဲ့ qty နဲ့ Total ကို ချက်ချင်းပြင် (optimistic) - server rerun ရောက်ရင် server တန်ဖိုးနဲ့ အစားထိုး
+    function patchTotal(e) {
+        var btn = e.target.closest && e.target.closest('button[data-qr-role]');
+        if (!btn) return;
+        var role = btn.dataset.qrRole;
+        if (role !== 'qty' && role !== 'cancel') return;
+        var doc = parentDoc();
+        if (!doc) return;
+        var row = btn.closest('[data-testid="stHorizontalBlock"]');
+        var qtyEl = row && row.querySelector('.qty-display');
+        var totalEl = doc.getElementById('qr-total');
+        if (!qtyEl || !totalEl) return;
+        var price = +qtyEl.dataset.price, qty = +qtyEl.dataset.qty;
+        var isPlus = btn.closest('[class*="st-key-plus_"]') || (btn.textContent || '').indexOf('➕') !== -1;
+        var newQty = role === 'cancel' ? 0 : qty + (isPlus ? 1 : -1);
+        if (newQty < 0) return;
+        var total = +totalEl.dataset.total + (newQty - qty) * price;
+        qtyEl.dataset.qty = newQty;
+        qtyEl.textContent = newQty;
+        totalEl.dataset.total = total;
+        totalEl.textContent = total.toLocaleString('en-US') + ' Ks';
+    }
+
+    // Parent ရဲ့ document - ဒီ iframe ဖြုတ်ခံရပြီးရင် parent က null ဖြစ်/throw လုပ်တတ်လို့ null ပြန်
+    function parentDoc() {
+        try { return (parent && parent !== window && parent.document) || null; } catch (e) { return null; }
+    }
+
+    // ဒီ iframe က တပ်ထားတဲ့ observer + click listener ကို ဖြုတ် (parent မရောက်တော့ရင်လည်း ခေါ်လို့ရ)
+    function uninstall(host) {
+        try { mo.disconnect(); } catch (e) {}
+        try { host.document.body.removeEventListener('click', patchTotal, true); } catch (e) {}
+        try { if (host.__qrMenuStyler && host.__qrMenuStyler.owner === window) host.__qrMenuStyler = null; } catch (e) {}
+    }
+
+    // တစ်ခါ run ပြီး DOM ထဲ node ပြောင်းမှ ပြန် run (idle ဖြစ်နေရင် scan မလုပ်) - frame တစ်ခုမှာ တစ်ခါပဲ
+    var host = parent;
+    var pending = false;
+    var mo = new MutationObserver(function() {
+        if (pending) return;
+        if (!parentDoc()) { uninstall(host); return; }  // iframe ဖြုတ်ခံရပြီ - parent.document မရောက်တော့
+        pending = true;
+        requestAnimationFrame(function() {
+            pending = false;
+            if (parentDoc()) styleQtyButtons();
+        });
+    });
+
+    // Parent window တစ်ခုမှာ တစ်ခါပဲ တပ် (flag = တပ်ခဲ့တဲ့ iframe window)
+    // Cart ပိတ်/ပြန်ဖွင့်ရင် iframe အသစ်ဖြစ်တယ် - အရင် iframe မရှိတော့မှ သူ့ဟာ ဖြုတ်ပြီး အသစ်တပ်
+    var doc = parentDoc();
+    if (doc) {
+        var prev = host.__qrMenuStyler;
+        var prevAlive = false;
+        try { prevAlive = !!(prev && prev.owner && !prev.owner.closed && prev.owner.parent === host); } catch (e) {}
+        if (!prevAlive) {
+            if (prev) {
+                try { prev.mo.disconnect(); } catch (e) {}
+                try { doc.body.removeEventListener('click', prev.click, true); } catch (e) {}
+            }
+            host.__qrMenuStyler = {owner: window, mo: mo, click: patchTotal};
+            styleQtyButtons();
+            // Click listener - body မှာ တစ်ခုတည်း (delegated)
+            doc.body.addEventListener('click', patchTotal, {capture: true, passive: true});
+            mo.observe(doc.body, {childList: true, subtree: true});
+            window.addEventListener('pagehide', function() { uninstall(host); });
+        }
+    }
+</script>
+"""
+
+def order_sent_box_html(table_no, amount):
+    """Green 'Order ပို့ပြီးပါပြီ!' box (styles: .order-box-sent in customer CSS)"""
+    return (
+        '<div class="order-box order-box-sent">'
+        '<div class="ob-head"><span class="ob-icon">✅</span><span class="ob-title">Order ပို့ပြီးပါပြီ!</span></div>'
+        f'<div class="ob-line">🪑 table: {html.escape(str(table_no))} &nbsp;&nbsp;&nbsp;&nbsp;|&nbsp;&nbsp;&nbsp;&nbsp; amount: {format_price(amount)} Ks</div>'
+        '</div>'
+    )
+
+
 def _uploaded_image_to_data_url(uploaded_file, max_kb=200):
     """ကွန်ပျူတာက တင်ထားတဲ့ ပုံကို base64 data URL ပြောင်း (Firestore အတွက် အရွယ်အစား ကန့်သတ်)"""
     if uploaded_file is None:
@@ -469,7 +941,7 @@ def _uploaded_image_to_data_url(uploaded_file, max_kb=200):
     data = uploaded_file.read()
     if len(data) > max_kb * 1024:
         return None
-    b64 = base64.b64encode(data).decode("ascii")
+    b64 = binascii.b2a_base64(data, newline=False).decode("ascii")
     mime = uploaded_file.type or "image/png"
     return f"data:{mime};base64,{b64}"
 
@@ -480,56 +952,73 @@ def _is_image_url(val):
         return False
     return val.startswith(("http://", "https://", "data:"))
 
+
+_SAFE_FILENAME_CHARS = frozenset(string.ascii_letters + string.digits + "-_")
+
+def _safe_filename(name):
+    """Download filename အတွက် - ASCII letter/digit/-_ မဟုတ်တာ '_' ပြောင်း"""
+    return "".join(c if c in _SAFE_FILENAME_CHARS else "_" for c in name).strip("_")[:50] or "menu"
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _make_qr_image_bytes(data_url, box_size=10, border=4):
+    """QR code PNG bytes (pure in its arguments, so cached across reruns)
+    segno က 1-bit PNG တိုက်ရိုက်ရေး - PIL image/RGB encode မလို"""
+    buf = BytesIO()
+    segno.make_qr(data_url, error='l').save(buf, kind='png', scale=box_size, border=border)
+    return buf.getvalue()
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _make_qr_svg(data_url):
+    """QR code as inline SVG for on-screen preview (segno - no Pillow raster/PNG encode)"""
+    return segno.make_qr(data_url, error='l').svg_inline(scale=10, border=4)
+
 # ============================================
 # SESSION STATE
 # ============================================
-if 'is_admin' not in st.session_state:
-    st.session_state.is_admin = False
-if 'current_store' not in st.session_state:
-    st.session_state.current_store = None
-if 'editing_id' not in st.session_state:
-    st.session_state.editing_id = None
-if 'search_query' not in st.session_state:
-    st.session_state.search_query = ""
-if 'editing_store' not in st.session_state:
-    st.session_state.editing_store = None
-if 'confirm_delete_store' not in st.session_state:
-    st.session_state.confirm_delete_store = None
-if 'sa_confirm_delete' not in st.session_state:
-    st.session_state.sa_confirm_delete = None
-if 'cart' not in st.session_state:
-    st.session_state.cart = []
-if 'view_mode' not in st.session_state:
-    st.session_state.view_mode = 'menu'
-if 'table_no' not in st.session_state:
-    st.session_state.table_no = ""
-if 'last_pending_count' not in st.session_state:
-    st.session_state.last_pending_count = 0
-if 'sound_enabled' not in st.session_state:
-    st.session_state.sound_enabled = True
-if 'auto_refresh' not in st.session_state:
-    st.session_state.auto_refresh = True
-if 'order_success' not in st.session_state:
-    st.session_state.order_success = None
-if 'last_order_id' not in st.session_state:
-    st.session_state.last_order_id = None  # For customer: show "preparing" noti when admin marks order
-if 'preparing_sound_played' not in st.session_state:
-    st.session_state.preparing_sound_played = None  # order_id that we already played preparing sound for
-if 'order_success_sound_played' not in st.session_state:
-    st.session_state.order_success_sound_played = None  # order_id that we already played "order ပို့ပြီး" sound for
-if 'collapse_sidebar_after_login' not in st.session_state:
-    st.session_state.collapse_sidebar_after_login = False  # login ပြီးရင် sidebar auto collapse
-if 'sidebar_collapsed_on_load' not in st.session_state:
-    st.session_state.sidebar_collapsed_on_load = False  # page ဖွင့်ဖွင့်ချင်း sidebar auto collapse တစ်ခါပဲ
-if 'collapse_on_counter_view' not in st.session_state:
-    st.session_state.collapse_on_counter_view = False  # Counter နှိပ်ပြီး ဒီ view ရောက်ရင် sidebar ပိတ်မယ်
-if 'confirm_clear_history' not in st.session_state:
-    st.session_state.confirm_clear_history = False
-if 'confirm_clear_all_history' not in st.session_state:
-    st.session_state.confirm_clear_all_history = False
+_SESSION_DEFAULTS = {
+    'is_admin': False,
+    'is_super_admin': False,
+    'current_store': None,
+    'editing_id': None,
+    'search_query': "",
+    'editing_store': None,
+    'confirm_delete_store': None,
+    'sa_confirm_delete': None,
+    'cart': {},  # item_id -> {'name', 'price', 'price_int', 'name_html', 'price_html', 'qty', 'line'} (insertion order = ADD order)
+    'cart_total': 0,  # cart ပြင်တိုင်း callback က ထိန်း - render/submit မှာ ပြန်မပေါင်း
+    'view_mode': 'menu',
+    'table_no': "",
+    'last_pending_count': 0,
+    'sound_enabled': True,
+    'auto_refresh': True,
+    'order_success': None,
+    'pending_order': None,  # {'order_id', 'future', 'cart'} - background save_order မပြီးသေးခင် (fail ရင် rollback)
+    'last_order_id': None,  # For customer: show "preparing" noti when admin marks order
+    'preparing_sound_played': None,  # order_id that we already played preparing sound for
+    'collapse_sidebar_after_login': False,  # login ပြီးရင် sidebar auto collapse
+    'sidebar_collapsed_on_load': False,  # page ဖွင့်ဖွင့်ချင်း sidebar auto collapse တစ်ခါပဲ
+    'collapse_on_counter_view': False,  # Counter နှိပ်ပြီး ဒီ view ရောက်ရင် sidebar ပိတ်မယ်
+    'confirm_clear_history': False,
+    'confirm_clear_all_history': False,
+    'cleanup_done_today': None,  # Counter Dashboard auto cleanup ပြီးခဲ့တဲ့ ရက် ("YYYY-MM-DD")
+}
+for _key, _default in _SESSION_DEFAULTS.items():
+    # list/dict default ကို session တစ်ခုချင်း copy ပေး (session အချင်းချင်း မမျှအောင်)
+    st.session_state.setdefault(_key, _default.copy() if isinstance(_default, (list, dict)) else _default)
 
 SUPER_ADMIN_KEY = "superadmin123"
 
+# Customer order tracking refresh (ms) - completed/None ဆိုရင် refresh မလုပ်
+CUSTOMER_TRACK_REFRESH_MS = {
+    'pending': 6000,     # ၆ စက္ကန့် (Admin Complete မြန်မြန် ပြန့်အောင်)
+    'preparing': 20000,
+}
+
+# True ဆိုရင် cart ခလုတ် styler script (QTY_BUTTON_STYLER_HTML) မထည့် - .streamlit/config.toml theme နဲ့ပဲ ပြ
+USE_NATIVE_THEME = False
+
 # ============================================
 # COLOR CONFIGURATION - ဒီမှာ အရောင်တွေ ပြောင်းလို့ရပါတယ်
 # ============================================
@@ -559,6 +1048,121 @@ COLORS = {
     "total_bg_end": "#1a5276",    # Total box gradient end
 }
 
+# Cart Total box - COLORS က မပြောင်းလို့ import တုန်းက တစ်ခါပဲ ထည့်၊ rerun မှာ total ပဲ format
+# #qr-total ကို ➖/➕/Cancel နှိပ်တာနဲ့ styler script က client ဘက်မှာ ကြိုပြင် (server rerun ရောက်ရင် အစားထိုး)
+CART_TOTAL_HTML = (
+    f'<div style="background: linear-gradient(135deg, {COLORS["total_bg_start"]} 0%, {COLORS["total_bg_end"]} 100%); '
+    'padding: 15px; border-radius: 10px; text-align: center; margin: 15px 0;">'
+    '<div style="color: #fff; font-size: 1.5em; font-weight: bold;">💰 Total: '
+    '<span id="qr-total" data-total="{total_raw}">{total} Ks</span></div>'
+    '</div>'
+)
+
+# Customer view CSS - static rules က styles/customer.css ထဲမှာ၊ COLORS ကို CSS variable နဲ့ပဲ ထည့်
+# (import တစ်ခါပဲ ဖတ် - main() ထဲမှာ rerun တိုင်း file မဖတ်ဘူး)
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "styles", "customer.css"), encoding="utf-8") as _f:
+    _CUSTOMER_CSS_RULES = _f.read()
+
+CUSTOMER_CSS = f"""
+<style>
+:root {{
+    --add-btn: {COLORS["add_btn"]};
+    --order-start: {COLORS["order_btn_start"]};
+    --order-end: {COLORS["order_btn_end"]};
+}}
+{_CUSTOMER_CSS_RULES}</style>
+"""
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _bg_css(bg_color, bg_image):
+    """Menu page background <style> (အရောင် + data: နောက်ခံပုံ) - store setting မပြောင်းရင် rerun တိုင်း မဆောက်"""
+    bg_image_css = ''
+    if bg_image and bg_image.startswith('data:'):
+        # CSS url() ထဲ ထည့်ရင် " နဲ့ \ escape
+        bg_esc = bg_image.replace('\\', '\\\\').replace('"', '\\"')
+        bg_image_css = f"""
+        background-image: url("{bg_esc}") !important;
+        background-size: cover !important;
+        background-position: center !important;
+        background-attachment: fixed !important;
+        """
+    return f"""
+    <style>
+    .stApp {{
+        background-color: {bg_color} !important;
+        {bg_image_css}
+        padding-top: 0 !important;
+    }}
+    [data-testid="stAppViewContainer"] {{
+        padding-top: 0.5rem !important;
+    }}
+    [data-testid="stSidebar"] > div:first-child {{
+        background-color: {bg_color} !important;
+        {bg_image_css}
+    }}
+    header[data-testid="stHeader"], [data-testid="stHeader"], header {{
+        background-color: {bg_color} !important;
+    }}
+    .block-container {{
+        padding-top: 0.5rem !important;
+        max-width: 100%;
+        overflow: visible !important;
+    }}
+    [data-testid="stMarkdown"]:has(.header-wrapper-outer) {{ overflow: visible !important; max-width: none !important; }}
+    </style>
+    """
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _header_css(tit_font, tit_size, tit_color, sub_font, sub_size, sub_color):
+    """Store header (ဆိုင်အမည် + subtitle) <style> - Super Admin font/size/color setting အလိုက် cache"""
+    return f"""
+    <style>
+    /* ခေါင်းစဉ် ဖြတ်မပြအောင် Streamlit content width ကို ကျော်ပြီး viewport အပြည့် နေရာယူ */
+    .header-wrapper-outer {{
+        width: 100vw;
+        position: relative;
+        left: 50%;
+        right: 50%;
+        margin-left: -50vw !important;
+        margin-right: -50vw !important;
+        overflow: visible !important;
+        box-sizing: border-box;
+    }}
+    .header-container {{
+        text-align: center;
+        padding: 14px 0 12px 0;
+        width: 100%;
+        max-width: 100%;
+        overflow: visible !important;
+        box-sizing: border-box;
+    }}
+    /* မြန်မာစာ အမြင့်သရ/အမှတ် မဖြတ်အောင် line-height နဲ့ padding */
+    .header-title {{
+        font-family: {tit_font};
+        font-size: {tit_size};
+        font-weight: bold;
+        color: {tit_color};
+        margin: 10px 0 5px 0;
+        white-space: normal;
+        word-wrap: break-word;
+        overflow-wrap: break-word;
+        overflow: visible !important;
+        max-width: 100%;
+        line-height: 1.5 !important;
+        padding-top: 0.2em;
+        padding-bottom: 0.1em;
+    }}
+    .header-subtitle {{
+        font-family: {sub_font};
+        font-size: {sub_size};
+        font-weight: bold;
+        color: {sub_color};
+        letter-spacing: 3px;
+        line-height: 1.4;
+    }}
+    </style>
+    """
+
 def play_notification_sound():
     """Play notification sound for new orders"""
     # Using a simple beep sound via JavaScript
@@ -591,6 +1195,52 @@ def play_notification_sound():
     """
     components.html(sound_js, height=0)
 
+# ============================================
+# CART CALLBACKS - on_click မှာ cart ပြင် (click တစ်ခါ = rerun တစ်ခါ၊ st.rerun() ထပ်မလို)
+# ============================================
+def _cart_add(item):
+    """ADD - cart ထဲ ရှိပြီးသားဆိုရင် qty တိုး (item_id နဲ့ တိုက်ရိုက်ရှာ)"""
+    cart = st.session_state.cart
+    entry = cart.get(item['item_id'])
+    if entry:
+        _cart_change_qty(item['item_id'], 1)
+        return
+    entry = cart[item['item_id']] = {
+        'name': item['name'],
+        'price': item['price'],
+        'price_int': parse_price(item['price']),  # ADD တုန်းက တစ်ခါပဲ parse
+        'name_html': item['name_html'],
+        'price_html': item['price_html'],
+        'qty': 1,
+        'line': f"{item['name']} x1",  # order items_str အပိုင်း
+    }
+    st.session_state.cart_total += entry['price_int']
+
+def _cart_change_qty(iid, delta):
+    """➖/➕ - qty 0 ရောက်ရင် cart ထဲက ဖယ်"""
+    cart = st.session_state.cart
+    entry = cart.get(iid)
+    if entry is None:
+        return
+    delta = max(delta, -entry['qty'])
+    entry['qty'] += delta
+    st.session_state.cart_total += entry['price_int'] * delta
+    if entry['qty'] <= 0:
+        del cart[iid]
+    else:
+        entry['line'] = f"{entry['name']} x{entry['qty']}"
+
+def _cart_remove(iid):
+    """Cancel - item တစ်ခုလုံး ဖယ်"""
+    entry = st.session_state.cart.pop(iid, None)
+    if entry:
+        st.session_state.cart_total -= entry['price_int'] * entry['qty']
+
+def _cart_clear():
+    """Cart ရှင်းမည်"""
+    st.session_state.cart = {}
+    st.session_state.cart_total = 0
+
 # ============================================
 # MAIN APP
 # ============================================
@@ -608,13 +1258,12 @@ def main():
         """)
         return
     
-    # Use db object id for caching
-    db_id = id(db)
-    stores = load_stores(db_id)
+    stores = load_stores()
     
     # nza2.py လို - customer mode အတွက် CSS မထည့်ပါ (sidebar အမြဲပေါ်မယ်)
-    query_params = st.query_params
-    url_store_id = query_params.get("store", None)
+    query_params = st.query_params.to_dict()  # proxy ကို တစ်ခါပဲ ဖတ် - အောက်မှာ plain dict
+    url_store_id = query_params.get("store")
+    url_table = query_params.get("table")
     is_customer_mode = url_store_id is not None and not st.session_state.is_admin
     
     # Page ဖွင့်ဖွင့်ချင်း sidebar auto collapse (customer mode မဟုတ်ရင် တစ်ခါပဲ)
@@ -624,193 +1273,13 @@ def main():
     
     # Custom styling for customers (using COLORS config)
     if not st.session_state.is_admin:
-        st.markdown(f"""
-        <style>
-        /* Make all buttons compact */
-        button {{
-            padding: 5px 12px !important;
-            min-height: 0 !important;
-            height: auto !important;
-            border-radius: 8px !important;
-        }}
-        button p {{
-            font-size: 14px !important;
-            margin: 0 !important;
-        }}
-        
-        /* ============================================ */
-        /* Menu Item Row - Name left, Price right */
-        /* ============================================ */
-        .menu-item-row {{
-            display: flex !important;
-            justify-content: space-between !important;
-            align-items: center !important;
-            width: 100% !important;
-            padding: 5px 0 !important;
-        }}
-        .menu-item-row .item-name {{
-            font-weight: 600 !important;
-            font-size: 16px !important;
-            color: #333 !important;
-        }}
-        .menu-item-row .item-price {{
-            font-size: 15px !important;
-            color: #2E8B57 !important;
-            font-weight: 500 !important;
-        }}
-        
-        /* ============================================ */
-        /* ADD buttons - customizable color */
-        /* ============================================ */
-        button[kind="secondary"] {{
-            background: {COLORS["add_btn"]} !important;
-            border: none !important;
-            border-radius: 8px !important;
-            padding: 8px 20px !important;
-            color: #fff !important;
-            font-weight: 600 !important;
-            font-size: 16px !important;
-            min-width: auto !important;
-        }}
-        button[kind="secondary"]:hover {{
-            opacity: 0.85 !important;
-        }}
-        button[kind="secondary"] p {{
-            color: #fff !important;
-            font-weight: 600 !important;
-            font-size: 16px !important;
-        }}
-        /* Primary buttons - Order button */
-        button[kind="primary"] {{
-            background: linear-gradient(90deg, {COLORS["order_btn_start"]} 0%, {COLORS["order_btn_end"]} 100%) !important;
-            border: none !important;
-            border-radius: 20px !important;
-        }}
-        button[kind="primary"]:hover {{
-            opacity: 0.9 !important;
-        }}
-        /* Item container style */
-        div[data-testid="stVerticalBlock"] > div[data-testid="element-container"] > div[data-testid="stContainer"] {{
-            border-radius: 12px !important;
-            padding: 10px !important;
-        }}
-        
-        /* ============================================ */
-        /* Hide marker divs */
-        /* ============================================ */
-        .cart-order-marker, .cart-item-marker, .menu-item-marker, .qty-btn-marker {{
-            display: none;
-        }}
-        
-        /* ============================================ */
-        /* Menu Item - Force Horizontal ALWAYS */
-        /* ============================================ */
-        .menu-item-marker + div[data-testid="stHorizontalBlock"] {{
-            flex-wrap: nowrap !important;
-            flex-direction: row !important;
-            align-items: center !important;
-            gap: 0 !important;
-        }}
-        .menu-item-marker + div[data-testid="stHorizontalBlock"] > div {{
-            display: flex !important;
-            align-items: center !important;
-            width: auto !important;
-            flex: none !important;
-        }}
-        .menu-item-marker + div[data-testid="stHorizontalBlock"] > div:nth-child(1) {{
-            flex: 2 1 0 !important;
-            min-width: 0 !important;
-        }}
-        .menu-item-marker + div[data-testid="stHorizontalBlock"] > div:nth-child(2) {{
-            flex: 1 1 0 !important;
-            min-width: 0 !important;
-        }}
-        .menu-item-marker + div[data-testid="stHorizontalBlock"] > div:nth-child(3) {{
-            flex: 0 0 auto !important;
-            justify-content: flex-end !important;
-        }}
-        
-        /* Override Streamlit's responsive breakpoints */
-        @media (max-width: 768px) {{
-            .menu-item-marker + div[data-testid="stHorizontalBlock"] {{
-                flex-wrap: nowrap !important;
-                flex-direction: row !important;
-            }}
-            .menu-item-marker + div[data-testid="stHorizontalBlock"] > div {{
-                width: auto !important;
-            }}
-        }}
-        
-        /* ============================================ */
-        /* Cart Item Buttons - Force Horizontal on Mobile */
-        /* ============================================ */
-        .cart-item-marker + div[data-testid="stHorizontalBlock"] {{
-            flex-wrap: nowrap !important;
-            flex-direction: row !important;
-            gap: 5px !important;
-        }}
-        .cart-item-marker + div[data-testid="stHorizontalBlock"] > div {{
-            flex: none !important;
-            width: auto !important;
-            min-width: 0 !important;
-        }}
-        .cart-item-marker + div[data-testid="stHorizontalBlock"] > div:first-child {{
-            flex: 2 !important;
-        }}
-        
-        /* ============================================ */
-        /* Adjacent Cart & Order buttons */
-        /* ============================================ */
-        .cart-order-marker + div[data-testid="stHorizontalBlock"] {{
-            flex-wrap: nowrap !important;
-            flex-direction: row !important;
-            gap: 0 !important;
-        }}
-        .cart-order-marker + div[data-testid="stHorizontalBlock"] > div {{
-            padding-left: 0 !important;
-            padding-right: 0 !important;
-            flex: 1 !important;
-        }}
-        /* Cart button - left rounded, white with border */
-        .cart-order-marker + div[data-testid="stHorizontalBlock"] > div:first-child button {{
-            border-radius: 25px 0 0 25px !important;
-            border: 1px solid #ccc !important;
-            border-right: none !important;
-            background: #fff !important;
-            color: #333 !important;
-        }}
-        .cart-order-marker + div[data-testid="stHorizontalBlock"] > div:first-child button:hover {{
-            background: #f5f5f5 !important;
-        }}
-        /* Order button - right rounded, green gradient */
-        .cart-order-marker + div[data-testid="stHorizontalBlock"] > div:last-child button {{
-            border-radius: 0 25px 25px 0 !important;
-            background: linear-gradient(90deg, {COLORS["order_btn_start"]} 0%, {COLORS["order_btn_end"]} 100%) !important;
-            border: none !important;
-        }}
-        .cart-order-marker + div[data-testid="stHorizontalBlock"] > div:last-child button:hover {{
-            opacity: 0.9 !important;
-        }}
-        
-        /* ============================================ */
-        /* 3-Column Category Layout Styling */
-        /* ============================================ */
-        .category-column {{
-            background: #fafafa;
-            border-radius: 15px;
-            padding: 10px;
-            margin: 5px 0;
-        }}
-        </style>
-        """, unsafe_allow_html=True)
+        st.markdown(CUSTOMER_CSS, unsafe_allow_html=True)
     
     # ============================================
     # SIDEBAR - nza2.py ပုံစံအတိုင်း (sidebar အမြဲပေါ်မယ်)
     # ============================================
     st.sidebar.title("📱 QR Menu & Order")
     
-    url_table = query_params.get("table", None)
-    
     if url_table:
         st.session_state.table_no = url_table
     
@@ -818,8 +1287,7 @@ def main():
     store_from_url = False
     
     if stores:
-        store_options = {s['store_name']: s for s in stores}
-        store_by_id = {s['store_id']: s for s in stores}
+        store_names, store_options, store_by_id = _store_indexes(_stores_version())
         
         if url_store_id and url_store_id in store_by_id:
             current_store = store_by_id[url_store_id]
@@ -827,8 +1295,8 @@ def main():
             if st.session_state.is_admin:
                 selected_store_name = st.sidebar.selectbox(
                     "🏪 ဆိုင်ရွေးပါ",
-                    options=list(store_options.keys()),
-                    index=list(store_options.keys()).index(current_store['store_name'])
+                    options=store_names,
+                    index=store_names.index(current_store['store_name'])
                 )
                 current_store = store_options[selected_store_name]
             else:
@@ -836,7 +1304,7 @@ def main():
         else:
             selected_store_name = st.sidebar.selectbox(
                 "🏪 ဆိုင်ရွေးပါ",
-                options=list(store_options.keys())
+                options=store_names
             )
             current_store = store_options[selected_store_name]
         
@@ -881,7 +1349,7 @@ def main():
                 else:
                     st.sidebar.error("❌ Password မှားနေပါတယ်။")
     else:
-        if st.session_state.get('is_super_admin'):
+        if st.session_state.is_super_admin:
             st.sidebar.success("👑 Super Admin Mode")
         else:
             st.sidebar.success("👨‍💼 Admin Mode")
@@ -890,9 +1358,9 @@ def main():
         st.sidebar.divider()
         st.sidebar.caption("📺 View Mode")
         # Super Admin မှာ Counter Dashboard မရှိတော့ လမ်းလွဲမရအောင် counter ဆိုရင် menu ပြောင်း
-        if st.session_state.get('is_super_admin') and st.session_state.view_mode == 'counter':
+        if st.session_state.is_super_admin and st.session_state.view_mode == 'counter':
             st.session_state.view_mode = 'menu'
-        if st.session_state.get('is_super_admin'):
+        if st.session_state.is_super_admin:
             # Super Admin အတွက် Counter Dashboard မပါဘူး - Menu နဲ့ Super Admin ပဲ
             v_menu = st.session_state.view_mode == 'menu'
             v_super = st.session_state.view_mode == 'superadmin'
@@ -935,7 +1403,7 @@ def main():
             st.rerun()
     
     # Login / View mode ပြောင်း / Logout ပြီးတိုင်း sidebar auto collapse (တစ်ကြိမ်ပဲ - မှန်မှန်ပိတ်အောင်)
-    if st.session_state.get('collapse_sidebar_after_login'):
+    if st.session_state.collapse_sidebar_after_login:
         st.session_state.collapse_sidebar_after_login = False
         components.html("""
         <script>
@@ -955,11 +1423,15 @@ def main():
     
     # Customer Cart - moved to bottom of page for customer mode (see below in main content)
     
+    # Categories/items - sidebar admin, counter, menu view အားလုံး သုံး (run တစ်ခါ load တစ်ခါပဲ)
+    categories = load_categories(current_store['store_id']) if current_store else []
+    items = load_menu_items(current_store['store_id']) if current_store else []
+    
     # Admin Controls
     if st.session_state.is_admin and st.session_state.view_mode == 'menu':
         st.sidebar.divider()
         
-        if st.session_state.get('is_super_admin'):
+        if st.session_state.is_super_admin:
             with st.sidebar.expander("🏪 ဆိုင်အသစ်ထည့်ရန်", expanded=False):
                 with st.form("add_store_form", clear_on_submit=True):
                     new_store_id = st.text_input("Store ID *", placeholder="naypyidaw")
@@ -968,8 +1440,12 @@ def main():
                     new_subtitle = st.text_input("Subtitle", value="Food & Drinks")
                     new_bg_color = st.color_picker("Background Color", value="#ffffff")
                     new_active = st.checkbox("ဆိုင်ဖွင့်မည် (Active)", value=True, help="ပိတ်ထားရင် ဆိုင်က စာရင်းမှာ ပိတ်ထားသလို ပြမယ်")
+                    new_seed_cats = st.text_input("အမျိုးအစားများ (optional)", placeholder="Coffee, Tea, Desserts", help="ကော်မာ (,) ခံပြီး ရေးပါ — ဆိုင်နဲ့အတူ တစ်ခါတည်း ထည့်မယ်")
                     if st.form_submit_button("➕ ဆိုင်ထည့်မည်", use_container_width=True):
                         if new_store_id and new_store_name and new_admin_key:
+                            seed_cats = list(dict.fromkeys(
+                                c.strip() for c in new_seed_cats.replace('၊', ',').split(',') if c.strip()
+                            ))
                             save_store(db, {
                                 'store_id': new_store_id.strip().lower(),
                                 'store_name': new_store_name.strip(),
@@ -979,7 +1455,7 @@ def main():
                                 'bg_color': new_bg_color if new_bg_color != "#ffffff" else '',
                                 'bg_image': '',
                                 'active': new_active
-                            })
+                            }, seed_categories=seed_cats)
                             st.success(f"✅ '{new_store_name}' ထည့်ပြီးပါပြီ။")
                             st.rerun()
                         else:
@@ -1000,23 +1476,12 @@ def main():
                         qr_url = f"{base_url}/?store={current_store['store_id']}&embed=true"
                     st.code(qr_url, language=None)
                     if st.button("🔲 Online QR ထုတ်မည်", use_container_width=True):
-                        qr = qrcode.QRCode(
-                            version=1,
-                            error_correction=qrcode.constants.ERROR_CORRECT_L,
-                            box_size=10,
-                            border=4,
-                        )
-                        qr.add_data(qr_url)
-                        qr.make(fit=True)
-                        qr_img = qr.make_image(fill_color="black", back_color="white")
-                        buf = BytesIO()
-                        qr_img.save(buf, format="PNG")
-                        buf.seek(0)
-                        st.image(buf, caption=f"Online QR: {current_store['store_name']}")
+                        st.image(_make_qr_svg(qr_url), caption=f"Online QR: {current_store['store_name']}")
+                        qr_png = _make_qr_image_bytes(qr_url)
                         st.download_button(
                             label="📥 Download Online QR",
-                            data=buf.getvalue(),
-                            file_name=f"qr_online_{current_store['store_id']}_{qr_table or 'menu'}.png",
+                            data=qr_png,
+                            file_name=f"qr_online_{_safe_filename(current_store['store_id'])}_{_safe_filename(qr_table)}.png",
                             mime="image/png",
                             use_container_width=True
                         )
@@ -1027,151 +1492,153 @@ def main():
                     
                     st.divider()
                     st.markdown("**ဆိုင်အမည် ပြင်ရန်:**")
-                    with st.form("edit_store_form"):
-                        edit_store_name = st.text_input("ဆိုင်အမည်", value=current_store['store_name'])
-                        edit_admin_key = st.text_input("Admin Password", value=current_store.get('admin_key', ''))
-                        edit_subtitle = st.text_input("Subtitle", value=current_store.get('subtitle', 'Food & Drinks'))
-                        edit_bg_color = st.color_picker("Background Color", value=current_store.get('bg_color', '#ffffff') or '#ffffff')
-                        edit_bg_counter = st.checkbox("Counter Dashboard မှာလည်း Background ပြောင်းမယ်", value=current_store.get('bg_counter', False))
-                        st.markdown("**နောက်ခံပုံ (Desktop ကနေ ချိန်းမယ်):**")
-                        edit_bg_image_file = st.file_uploader("ပုံရွေးပါ (PNG, JPG, WebP)", type=["png", "jpg", "jpeg", "webp"], key="bg_image_upload", help="ပုံကြီးရင် ၅၀၀KB အောက် ရွေးပါ")
-                        edit_bg_image_clear = st.checkbox("နောက်ခံပုံ ဖယ်မယ် (အရောင်ပဲ သုံးမယ်)", value=False, key="bg_image_clear")
-                        if current_store.get('bg_image'):
-                            st.caption("လက်ရှိ နောက်ခံပုံ ထည့်ထားပြီး။ အသစ်ရွေးရင် အစားထိုးမယ်။")
-                        edit_active = st.checkbox("ဆိုင်ဖွင့်မည် (Active)", value=current_store.get('active', True), help="ပိတ်ထားရင် ဆိုင်က စာရင်းမှာ ပိတ်ထားသလို ပြမယ်")
-                        st.markdown("**စားပွဲနံပါတ် ပုံစံ:**")
-                        _fmt_opts = ["ဂဏန်းပဲ (1, 2, 3...)", "က္ခရာပဲ (A, B, C...)", "နှစ်မျိုးလုံး (ဂဏန်း + အက္ခရာ)"]
-                        _fmt_vals = ["numbers", "letters", "both"]
-                        _fmt_current = current_store.get('table_number_format') or 'numbers'
-                        _fmt_idx = _fmt_vals.index(_fmt_current) if _fmt_current in _fmt_vals else 0
-                        edit_table_number_format = st.selectbox("စားပွဲနံပါတ်", _fmt_opts, index=_fmt_idx, key="table_fmt_sel")
-                        edit_table_number_format_val = _fmt_vals[_fmt_opts.index(edit_table_number_format)]
-                        edit_header_payload = {}
-                        if st.session_state.get('is_super_admin'):
-                            st.divider()
-                            st.markdown("**ခေါင်းစဉ် ၂ ခု ပြင်ဆင်ရန် (Font / Size / Color)**")
-                            _font_opts = [
-                                ("Default (sans-serif)", "sans-serif"),
-                                ("Serif", "serif"),
-                                ("Monospace", "monospace"),
-                                ("Cursive", "cursive"),
-                                ("Arial", "Arial, sans-serif"),
-                                ("Helvetica", "Helvetica, sans-serif"),
-                                ("Times New Roman", "Times New Roman, serif"),
-                                ("Georgia", "Georgia, serif"),
-                                ("Verdana", "Verdana, sans-serif"),
-                                ("Tahoma", "Tahoma, sans-serif"),
-                                ("Trebuchet MS", "Trebuchet MS, sans-serif"),
-                                ("Courier New", "Courier New, monospace"),
-                                ("Comic Sans MS", "Comic Sans MS, cursive"),
-                                ("Impact", "Impact, sans-serif"),
-                                ("Lucida Sans", "Lucida Sans Unicode, sans-serif"),
-                                ("Palatino", "Palatino Linotype, serif"),
-                                ("Garamond", "Garamond, serif"),
-                                ("— မြန်မာ Font —", "sans-serif"),
-                                ("Myanmar3", "Myanmar3, sans-serif"),
-                                ("Padauk", "Padauk, sans-serif"),
-                                ("Noto Sans Myanmar", "Noto Sans Myanmar, sans-serif"),
-                                ("TharLon", "TharLon, sans-serif"),
-                                ("Pyidaungsu", "Pyidaungsu, sans-serif"),
-                                ("Masterpiece Uni Sans", "Masterpiece Uni Sans, sans-serif"),
-                                ("Yunghkio", "Yunghkio, sans-serif"),
-                                ("Myanmar Text", "Myanmar Text, sans-serif"),
-                                ("— Ayar မြန်မာ (လှသော) —", "sans-serif"),
-                                ("Ayar", "Ayar, sans-serif"),
-                                ("Ayar Takhu", "Ayar Takhu, sans-serif"),
-                                ("Ayar Kasone", "Ayar Kasone, sans-serif"),
-                                ("Ayar Nayon", "Ayar Nayon, sans-serif"),
-                                ("Ayar Wazo", "Ayar Wazo, sans-serif"),
-                                ("Ayar Wagaung", "Ayar Wagaung, sans-serif"),
-                                ("Ayar Tathalin", "Ayar Tathalin, sans-serif"),
-                                ("Ayar Thidingyut", "Ayar Thidingyut, sans-serif"),
-                                ("Ayar Tanzaungmone", "Ayar Tanzaungmone, sans-serif"),
-                                ("Ayar Juno", "Ayar Juno, sans-serif"),
-                                ("Ayar Typewriter", "Ayar Typewriter, sans-serif"),
-                            ]
-                            _font_labels = [x[0] for x in _font_opts]
-                            _font_vals = [x[1] for x in _font_opts]
-                            st.markdown("*ဆိုင်အမည် (ခေါင်းစဉ်)*")
-                            _tit_style = current_store.get('header_title_font_style') or 'sans-serif'
-                            edit_title_font_style = st.selectbox("Font style", _font_labels, index=_font_vals.index(_tit_style) if _tit_style in _font_vals else 0, key="tit_font_style")
-                            edit_title_font_size = st.text_input("Font size", value=current_store.get('header_title_font_size') or '3em', placeholder="3em or 48px", key="tit_font_size")
-                            edit_title_color = st.color_picker("Color", value=current_store.get('header_title_color') or COLORS["header_title"], key="tit_color")
-                            st.markdown("*Subtitle*")
-                            _sub_style = current_store.get('header_subtitle_font_style') or 'sans-serif'
-                            edit_subtitle_font_style = st.selectbox("Font style", _font_labels, index=_font_vals.index(_sub_style) if _sub_style in _font_vals else 0, key="sub_font_style")
-                            edit_subtitle_font_size = st.text_input("Font size", value=current_store.get('header_subtitle_font_size') or '1.5em', placeholder="1.5em or 24px", key="sub_font_size")
-                            edit_subtitle_color = st.color_picker("Color", value=current_store.get('header_subtitle_color') or COLORS["header_subtitle"], key="sub_color")
-                            edit_header_payload = {
-                                'header_title_font_style': _font_vals[_font_labels.index(edit_title_font_style)],
-                                'header_title_font_size': (edit_title_font_size or '3em').strip(),
-                                'header_title_color': edit_title_color,
-                                'header_subtitle_font_style': _font_vals[_font_labels.index(edit_subtitle_font_style)],
-                                'header_subtitle_font_size': (edit_subtitle_font_size or '1.5em').strip(),
-                                'header_subtitle_color': edit_subtitle_color,
-                            }
-                            st.divider()
-                            st.markdown("**အမျိုးအစား box နဲ့ စာရောင်**")
-                            edit_cat_bg_start = st.color_picker("အမျိုးအစား box နောက်ခံ (စရောင်)", value=current_store.get('category_box_bg_start') or COLORS["category_bg_start"], key="cat_bg_start")
-                            edit_cat_bg_end = st.color_picker("အမျိုးအစား box နောက်ခံ (ဆုံးရောင်)", value=current_store.get('category_box_bg_end') or COLORS["category_bg_end"], key="cat_bg_end")
-                            edit_cat_font_color = st.color_picker("အမျိုးအစား box စာရောင်", value=current_store.get('category_box_font_color') or '#ffffff', key="cat_font_color")
-                            edit_header_payload['category_box_bg_start'] = edit_cat_bg_start
-                            edit_header_payload['category_box_bg_end'] = edit_cat_bg_end
-                            edit_header_payload['category_box_font_color'] = edit_cat_font_color
-                        if st.form_submit_button("💾 သိမ်းမည်", use_container_width=True):
-                            # နောက်ခံပုံ — ဖယ်မယ် / အသစ်ရွေးထား / လက်ရှိအတိုင်း
-                            if edit_bg_image_clear:
-                                new_bg_image = ''
-                            elif edit_bg_image_file is not None:
-                                data = edit_bg_image_file.read()
-                                mime = edit_bg_image_file.type or 'image/jpeg'
-                                if HAS_PIL and data:
-                                    try:
-                                        img = Image.open(BytesIO(data))
-                                        if img.mode in ('RGBA', 'P'):
-                                            img = img.convert('RGB')
-                                        out = BytesIO()
+                    # Form (font list, color pickers, uploader) က ကြီးလို့ ဖွင့်မှပဲ ဆောက် - expander ပိတ်ထားလည်း body က run နေလို့
+                    if st.toggle("✏️ ပြင်ဆင်မည်", key="edit_store_open"):
+                        with st.form("edit_store_form"):
+                            edit_store_name = st.text_input("ဆိုင်အမည်", value=current_store['store_name'])
+                            edit_admin_key = st.text_input("Admin Password", value=current_store.get('admin_key', ''))
+                            edit_subtitle = st.text_input("Subtitle", value=current_store.get('subtitle', 'Food & Drinks'))
+                            edit_bg_color = st.color_picker("Background Color", value=current_store.get('bg_color', '#ffffff') or '#ffffff')
+                            edit_bg_counter = st.checkbox("Counter Dashboard မှာလည်း Background ပြောင်းမယ်", value=current_store.get('bg_counter', False))
+                            st.markdown("**နောက်ခံပုံ (Desktop ကနေ ချိန်းမယ်):**")
+                            edit_bg_image_file = st.file_uploader("ပုံရွေးပါ (PNG, JPG, WebP)", type=["png", "jpg", "jpeg", "webp"], key="bg_image_upload", help="ပုံကြီးရင် ၅၀၀KB အောက် ရွေးပါ")
+                            edit_bg_image_clear = st.checkbox("နောက်ခံပုံ ဖယ်မယ် (အရောင်ပဲ သုံးမယ်)", value=False, key="bg_image_clear")
+                            if current_store.get('bg_image'):
+                                st.caption("လက်ရှိ နောက်ခံပုံ ထည့်ထားပြီး။ အသစ်ရွေးရင် အစားထိုးမယ်။")
+                            edit_active = st.checkbox("ဆိုင်ဖွင့်မည် (Active)", value=current_store.get('active', True), help="ပိတ်ထားရင် ဆိုင်က စာရင်းမှာ ပိတ်ထားသလို ပြမယ်")
+                            st.markdown("**စားပွဲနံပါတ် ပုံစံ:**")
+                            _fmt_opts = ["ဂဏန်းပဲ (1, 2, 3...)", "က္ခရာပဲ (A, B, C...)", "နှစ်မျိုးလုံး (ဂဏန်း + အက္ခရာ)"]
+                            _fmt_vals = ["numbers", "letters", "both"]
+                            _fmt_current = current_store.get('table_number_format') or 'numbers'
+                            _fmt_idx = _fmt_vals.index(_fmt_current) if _fmt_current in _fmt_vals else 0
+                            edit_table_number_format = st.selectbox("စားပွဲနံပါတ်", _fmt_opts, index=_fmt_idx, key="table_fmt_sel")
+                            edit_table_number_format_val = _fmt_vals[_fmt_opts.index(edit_table_number_format)]
+                            edit_header_payload = {}
+                            if st.session_state.is_super_admin:
+                                st.divider()
+                                st.markdown("**ခေါင်းစဉ် ၂ ခု ပြင်ဆင်ရန် (Font / Size / Color)**")
+                                _font_opts = [
+                                    ("Default (sans-serif)", "sans-serif"),
+                                    ("Serif", "serif"),
+                                    ("Monospace", "monospace"),
+                                    ("Cursive", "cursive"),
+                                    ("Arial", "Arial, sans-serif"),
+                                    ("Helvetica", "Helvetica, sans-serif"),
+                                    ("Times New Roman", "Times New Roman, serif"),
+                                    ("Georgia", "Georgia, serif"),
+                                    ("Verdana", "Verdana, sans-serif"),
+                                    ("Tahoma", "Tahoma, sans-serif"),
+                                    ("Trebuchet MS", "Trebuchet MS, sans-serif"),
+                                    ("Courier New", "Courier New, monospace"),
+                                    ("Comic Sans MS", "Comic Sans MS, cursive"),
+                                    ("Impact", "Impact, sans-serif"),
+                                    ("Lucida Sans", "Lucida Sans Unicode, sans-serif"),
+                                    ("Palatino", "Palatino Linotype, serif"),
+                                    ("Garamond", "Garamond, serif"),
+                                    ("— မြန်မာ Font —", "sans-serif"),
+                                    ("Myanmar3", "Myanmar3, sans-serif"),
+                                    ("Padauk", "Padauk, sans-serif"),
+                                    ("Noto Sans Myanmar", "Noto Sans Myanmar, sans-serif"),
+                                    ("TharLon", "TharLon, sans-serif"),
+                                    ("Pyidaungsu", "Pyidaungsu, sans-serif"),
+                                    ("Masterpiece Uni Sans", "Masterpiece Uni Sans, sans-serif"),
+                                    ("Yunghkio", "Yunghkio, sans-serif"),
+                                    ("Myanmar Text", "Myanmar Text, sans-serif"),
+                                    ("— Ayar မြန်မာ (လှသော) —", "sans-serif"),
+                                    ("Ayar", "Ayar, sans-serif"),
+                                    ("Ayar Takhu", "Ayar Takhu, sans-serif"),
+                                    ("Ayar Kasone", "Ayar Kasone, sans-serif"),
+                                    ("Ayar Nayon", "Ayar Nayon, sans-serif"),
+                                    ("Ayar Wazo", "Ayar Wazo, sans-serif"),
+                                    ("Ayar Wagaung", "Ayar Wagaung, sans-serif"),
+                                    ("Ayar Tathalin", "Ayar Tathalin, sans-serif"),
+                                    ("Ayar Thidingyut", "Ayar Thidingyut, sans-serif"),
+                                    ("Ayar Tanzaungmone", "Ayar Tanzaungmone, sans-serif"),
+                                    ("Ayar Juno", "Ayar Juno, sans-serif"),
+                                    ("Ayar Typewriter", "Ayar Typewriter, sans-serif"),
+                                ]
+                                _font_labels = [x[0] for x in _font_opts]
+                                _font_vals = [x[1] for x in _font_opts]
+                                st.markdown("*ဆိုင်အမည် (ခေါင်းစဉ်)*")
+                                _tit_style = current_store.get('header_title_font_style') or 'sans-serif'
+                                edit_title_font_style = st.selectbox("Font style", _font_labels, index=_font_vals.index(_tit_style) if _tit_style in _font_vals else 0, key="tit_font_style")
+                                edit_title_font_size = st.text_input("Font size", value=current_store.get('header_title_font_size') or '3em', placeholder="3em or 48px", key="tit_font_size")
+                                edit_title_color = st.color_picker("Color", value=current_store.get('header_title_color') or COLORS["header_title"], key="tit_color")
+                                st.markdown("*Subtitle*")
+                                _sub_style = current_store.get('header_subtitle_font_style') or 'sans-serif'
+                                edit_subtitle_font_style = st.selectbox("Font style", _font_labels, index=_font_vals.index(_sub_style) if _sub_style in _font_vals else 0, key="sub_font_style")
+                                edit_subtitle_font_size = st.text_input("Font size", value=current_store.get('header_subtitle_font_size') or '1.5em', placeholder="1.5em or 24px", key="sub_font_size")
+                                edit_subtitle_color = st.color_picker("Color", value=current_store.get('header_subtitle_color') or COLORS["header_subtitle"], key="sub_color")
+                                edit_header_payload = {
+                                    'header_title_font_style': _font_vals[_font_labels.index(edit_title_font_style)],
+                                    'header_title_font_size': (edit_title_font_size or '3em').strip(),
+                                    'header_title_color': edit_title_color,
+                                    'header_subtitle_font_style': _font_vals[_font_labels.index(edit_subtitle_font_style)],
+                                    'header_subtitle_font_size': (edit_subtitle_font_size or '1.5em').strip(),
+                                    'header_subtitle_color': edit_subtitle_color,
+                                }
+                                st.divider()
+                                st.markdown("**အမျိုးအစား box နဲ့ စာရောင်**")
+                                edit_cat_bg_start = st.color_picker("အမျိုးအစား box နောက်ခံ (စရောင်)", value=current_store.get('category_box_bg_start') or COLORS["category_bg_start"], key="cat_bg_start")
+                                edit_cat_bg_end = st.color_picker("အမျိုးအစား box နောက်ခံ (ဆုံးရောင်)", value=current_store.get('category_box_bg_end') or COLORS["category_bg_end"], key="cat_bg_end")
+                                edit_cat_font_color = st.color_picker("အမျိုးအစား box စာရောင်", value=current_store.get('category_box_font_color') or '#ffffff', key="cat_font_color")
+                                edit_header_payload['category_box_bg_start'] = edit_cat_bg_start
+                                edit_header_payload['category_box_bg_end'] = edit_cat_bg_end
+                                edit_header_payload['category_box_font_color'] = edit_cat_font_color
+                            if st.form_submit_button("💾 သိမ်းမည်", use_container_width=True):
+                                # နောက်ခံပုံ — ဖယ်မယ် / အသစ်ရွေးထား / လက်ရှိအတိုင်း
+                                if edit_bg_image_clear:
+                                    new_bg_image = ''
+                                elif edit_bg_image_file is not None:
+                                    data = edit_bg_image_file.read()
+                                    mime = edit_bg_image_file.type or 'image/jpeg'
+                                    if HAS_PIL and data:
                                         try:
-                                            r = getattr(Image, 'Resampling', None)
-                                            resample = r.LANCZOS if r else Image.LANCZOS
+                                            img = Image.open(BytesIO(data))
+                                            if img.mode in ('RGBA', 'P'):
+                                                img = img.convert('RGB')
+                                            out = BytesIO()
+                                            try:
+                                                r = getattr(Image, 'Resampling', None)
+                                                resample = r.LANCZOS if r else Image.LANCZOS
+                                            except Exception:
+                                                resample = 1
+                                            img.thumbnail((1200, 1200), resample)
+                                            img.save(out, 'JPEG', quality=82, optimize=True)
+                                            data = out.getvalue()
+                                            mime = 'image/jpeg'
                                         except Exception:
-                                            resample = 1
-                                        img.thumbnail((1200, 1200), resample)
-                                        img.save(out, 'JPEG', quality=82, optimize=True)
-                                        data = out.getvalue()
-                                        mime = 'image/jpeg'
-                                    except Exception:
-                                        pass
-                                b64 = base64.b64encode(data).decode('utf-8')
-                                if len(b64) > 900000:
-                                    st.warning("ပုံကြီးလို့ သိမ်းမရပါ။ ပုံသေးအောင် ချုံ့ပြီး ထပ်ရွေးပါ။")
-                                    new_bg_image = current_store.get('bg_image', '')
+                                            pass
+                                    b64 = binascii.b2a_base64(data, newline=False).decode('ascii')
+                                    if len(b64) > 900000:
+                                        st.warning("ပုံကြီးလို့ သိမ်းမရပါ။ ပုံသေးအောင် ချုံ့ပြီး ထပ်ရွေးပါ။")
+                                        new_bg_image = current_store.get('bg_image', '')
+                                    else:
+                                        new_bg_image = f"data:{mime};base64,{b64}"
                                 else:
-                                    new_bg_image = f"data:{mime};base64,{b64}"
-                            else:
-                                new_bg_image = current_store.get('bg_image', '')
-                            payload = {
-                                'store_name': edit_store_name.strip(),
-                                'admin_key': edit_admin_key.strip(),
-                                'logo': current_store.get('logo', '☕'),
-                                'subtitle': edit_subtitle.strip() or 'Food & Drinks',
-                                'bg_color': edit_bg_color if edit_bg_color != "#ffffff" else '',
-                                'bg_image': new_bg_image,
-                                'bg_counter': edit_bg_counter,
-                                'active': edit_active,
-                                'table_number_format': edit_table_number_format_val
-                            }
-                            payload.update(edit_header_payload)
-                            update_store(db, current_store['store_id'], payload)
-                            clear_all_cache()
-                            # သိမ်းပြီးနောက် store ကို ပြန်ယူပြီး session မှာ ထည့်မယ် — ခေါင်းစဉ် ပြောင်းလဲမှု ချက်ချင်းပြမယ်
-                            stores_after = load_stores(db_id)
-                            for s in stores_after:
-                                if s.get('store_id') == current_store['store_id']:
-                                    st.session_state.current_store = s
-                                    break
-                            st.success("✅ ပြင်ဆင်ပြီးပါပြီ")
-                            st.rerun()
+                                    new_bg_image = current_store.get('bg_image', '')
+                                payload = {
+                                    'store_name': edit_store_name.strip(),
+                                    'admin_key': edit_admin_key.strip(),
+                                    'logo': current_store.get('logo', '☕'),
+                                    'subtitle': edit_subtitle.strip() or 'Food & Drinks',
+                                    'bg_color': edit_bg_color if edit_bg_color != "#ffffff" else '',
+                                    'bg_image': new_bg_image,
+                                    'bg_counter': edit_bg_counter,
+                                    'active': edit_active,
+                                    'table_number_format': edit_table_number_format_val
+                                }
+                                payload.update(edit_header_payload)
+                                update_store(db, current_store['store_id'], payload)
+                                clear_all_cache()
+                                # သိမ်းပြီးနောက် store ကို ပြန်ယူပြီး session မှာ ထည့်မယ် — ခေါင်းစဉ် ပြောင်းလဲမှု ချက်ချင်းပြမယ်
+                                stores_after = load_stores()
+                                for s in stores_after:
+                                    if s.get('store_id') == current_store['store_id']:
+                                        st.session_state.current_store = s
+                                        break
+                                st.success("✅ ပြင်ဆင်ပြီးပါပြီ")
+                                st.rerun()
                     
                     st.divider()
                     st.markdown("**⚠️ ဆိုင်ဖျက်ရန်:**")
@@ -1198,9 +1665,7 @@ def main():
         
         if current_store:
             store_id = current_store['store_id']
-            categories = load_categories(db_id, store_id)
-            cat_names = [c['category_name'] for c in categories]
-            cat_by_name = {c['category_name']: c for c in categories}
+            cat_names, cat_by_name = index_categories(categories)
             
             with st.sidebar.expander("📁 အမျိုးအစား စီမံရန်", expanded=False):
                 new_cat = st.text_input("အမျိုးအစားအသစ်", placeholder="Desserts")
@@ -1209,22 +1674,23 @@ def main():
                         if new_cat.strip() not in cat_names:
                             save_category(db, store_id, new_cat.strip())
                             st.success(f"✅ '{new_cat}' ထည့်ပြီး။")
-                            st.rerun()
+                            # rerun မလုပ်ဘဲ အောက်က list/selectbox/menu အတွက် ဒီ run ထဲမှာပဲ ပြန် load
+                            categories = load_categories(store_id)
+                            cat_names, cat_by_name = index_categories(categories)
                         else:
                             st.warning("⚠️ ရှိပြီးသားပါ။")
                 
                 if cat_names:
                     st.caption("လက်ရှိ အမျိုးအစားများ:")
+                    cat_counts = Counter(i.get('category') for i in items)  # delete button အားလုံး မျှသုံး
                     for cat in cat_names:
                         col1, col2 = st.columns([3, 1])
                         with col1:
                             st.write(f"• {cat}")
                         with col2:
                             if st.button("🗑️", key=f"delcat_{cat}"):
-                                items = load_menu_items(db_id, store_id)
-                                items_in_cat = [i for i in items if i.get('category') == cat]
-                                if items_in_cat:
-                                    st.error(f"⚠️ ပစ္စည်း {len(items_in_cat)} ခုရှိနေပါသည်။")
+                                if cat_counts[cat]:
+                                    st.error(f"⚠️ ပစ္စည်း {cat_counts[cat]} ခုရှိနေပါသည်။")
                                 else:
                                     cat_data = cat_by_name.get(cat)
                                     if cat_data:
@@ -1246,13 +1712,12 @@ def main():
                                     'category': item_cat
                                 })
                                 st.success(f"✅ '{item_name}' ထည့်ပြီး။")
-                                st.rerun()
+                                items = load_menu_items(store_id)  # metric/menu အတွက် - rerun မလို
                             else:
                                 st.error("⚠️ အချက်အလက် ဖြည့်ပါ။")
                 else:
                     st.info("အမျိုးအစား အရင်ထည့်ပါ။")
             
-            items = load_menu_items(db_id, store_id)
             st.sidebar.divider()
             st.sidebar.metric("📊 ပစ္စည်းအရေအတွက်", len(items))
     
@@ -1260,17 +1725,16 @@ def main():
     # MAIN CONTENT
     # ============================================
     # Super Admin Dashboard (all stores overview)
-    if st.session_state.get('is_super_admin') and st.session_state.get('view_mode') == 'superadmin':
+    if st.session_state.is_super_admin and st.session_state.view_mode == 'superadmin':
         st.title("👑 Super Admin Dashboard")
         st.caption("ဆိုင်အားလုံး စာရင်း၊ ယနေ့ ရောင်းရငွေ၊ Active ဖွင့်/ပိတ်")
-        db = firestore.client()
-        all_stores = load_stores(db_id)
+        all_stores = load_stores()
         today = datetime.now().strftime("%Y-%m-%d")
         total_sales_today = 0
         total_orders_today = 0
         active_count = sum(1 for s in all_stores if s.get('active', True))
         for s in all_stores:
-            hist = load_daily_sales_history(db, s['store_id'], last_n_days=1)
+            hist = load_daily_sales_history(db, s['store_id'], last_n_days=1, today=today)
             day = hist[0] if hist and hist[0]['date'] == today else None
             s['_today_total'] = day['total'] if day else 0
             s['_today_orders'] = day['order_count'] if day else 0
@@ -1315,7 +1779,7 @@ def main():
                 st.text(f"Password: {pw}")
                 st.text(f"Active: {'ဖွင့်ထား' if is_active else 'ပိတ်ထား'}")
                 st.text(f"ယနေ့ ရောင်းရငွေ: {s['_today_total']:,.0f} Ks | ယနေ့ Order: {s['_today_orders']}")
-                if st.session_state.get('sa_confirm_delete') == s['store_id']:
+                if st.session_state.sa_confirm_delete == s['store_id']:
                     st.warning(f"'{s['store_name']}' ကို ဖျက်မှာ သေချာပါသလား? (ဆိုင်နဲ့ data အားလုံး ပျက်သွားပါမည်)")
                     col_yes, col_no = st.columns(2)
                     with col_yes:
@@ -1333,13 +1797,13 @@ def main():
                         if st.button("ပြင်မည်", key=f"sa_edit_{s['store_id']}", use_container_width=True):
                             st.session_state.current_store = s
                             st.session_state.view_mode = 'menu'
-                            load_stores.clear()
+                            clear_stores_cache()
                             st.rerun()
                     with btn_qr:
                         if st.button("QR", key=f"sa_qr_{s['store_id']}", use_container_width=True):
                             st.session_state.current_store = s
                             st.session_state.view_mode = 'menu'
-                            load_stores.clear()
+                            clear_stores_cache()
                             st.rerun()
                     with btn_toggle:
                         toggle_label = "ပိတ်မည်" if is_active else "ဖွင့်မည်"
@@ -1354,7 +1818,7 @@ def main():
                                 'bg_counter': s.get('bg_counter', False),
                                 'active': not is_active
                             })
-                            load_stores.clear()
+                            clear_stores_cache()
                             st.rerun()
                     with btn_del:
                         if st.button("🗑️ ဖျက်မည်", key=f"sa_del_{s['store_id']}", use_container_width=True):
@@ -1376,7 +1840,7 @@ def main():
     # Counter Dashboard View
     if st.session_state.is_admin and st.session_state.view_mode == 'counter':
         # Counter နှိပ်လိုက်တာနဲ့ sidebar auto collapse (view ရောက်ပြီးမှ ပိတ်မယ် - တစ်ကြိမ်ပဲ)
-        if st.session_state.get('collapse_on_counter_view'):
+        if st.session_state.collapse_on_counter_view:
             st.session_state.collapse_on_counter_view = False
             components.html("""
             <script>
@@ -1404,27 +1868,20 @@ def main():
                 </style>
                 """, unsafe_allow_html=True)
         
+        st.markdown(ORDER_CARD_CSS, unsafe_allow_html=True)
         st.title("🖥️ Counter Dashboard")
         st.subheader(f"📍 {current_store['store_name']}")
         
         # Auto cleanup on dashboard load (runs once per session)
-        if 'cleanup_done_today' not in st.session_state:
-            st.session_state.cleanup_done_today = None
-        
         today = datetime.now().strftime("%Y-%m-%d")
         if st.session_state.cleanup_done_today != today:
-            orders_deleted, sales_deleted = run_auto_cleanup(db, store_id)
+            orders_deleted, sales_deleted = run_auto_cleanup(db, store_id, today)
             st.session_state.cleanup_done_today = today
             if orders_deleted > 0 or sales_deleted > 0:
                 st.toast(f"🧹 Auto Cleanup: Orders {orders_deleted} ခု၊ Sales {sales_deleted} ခု ဖျက်ပြီး")
         
-        orders = load_orders(db_id, store_id)
-        
-        # Check for new orders and play sound
-        pending_count = len([o for o in orders if o.get('status') == 'pending'])
-        if st.session_state.sound_enabled and pending_count > st.session_state.last_pending_count:
-            play_notification_sound()
-        st.session_state.last_pending_count = pending_count
+        # Order History အတွက် (live အပိုင်းက fragment ထဲမှာ ကိုယ့်ဘာသာ load)
+        _, _, completed_orders, _, today_completed = bucket_orders(load_orders(store_id), today)
         
         # ပထမပုံစံ: နေ့စဉ်ရောင်းရငွေ ရွေးချယ်မှု + expander (ဒုတိယပုံ ယနေ့ကတ်ပြား မထည့်တော့ပါ)
         period_options = {
@@ -1440,7 +1897,7 @@ def main():
             key="sales_period"
         )
         days = period_options[period_label]
-        sales_list = load_daily_sales_history(db, store_id, last_n_days=days)
+        sales_list = load_daily_sales_history(db, store_id, last_n_days=days, today=today)
         grand_total = sum(s['total'] for s in sales_list)
         grand_orders = sum(s['order_count'] for s in sales_list)
         # အပေါ်က စုစုပေါင်း - bold + အနီရောင် (expander label မှာ HTML မရလို့ သီးသန့်ပြမယ်)
@@ -1471,128 +1928,122 @@ def main():
                         st.write(f"✅ {s['order_count']} ခု")
                     st.divider()
         
-        # Filter orders by status
-        col1, col2 = st.columns(2)
-        with col1:
-            pending_orders = [o for o in orders if o.get('status') == 'pending']
-            st.metric("⏳ Pending", len(pending_orders))
-        with col2:
-            preparing_orders = [o for o in orders if o.get('status') == 'preparing']
-            st.metric("👨‍🍳 Preparing", len(preparing_orders))
-        
-        st.divider()
-        
-        # Controls row
-        col_refresh, col_sound, col_auto = st.columns(3)
-        with col_refresh:
-            if st.button("🔄 Refresh", use_container_width=True):
-                load_orders.clear()
-                st.rerun()
-        with col_sound:
-            sound_label = "🔔" if st.session_state.sound_enabled else "🔕"
-            btn_type = "primary" if st.session_state.sound_enabled else "secondary"
-            if st.button(sound_label, use_container_width=True, type=btn_type, help="Sound ON/OFF"):
-                st.session_state.sound_enabled = not st.session_state.sound_enabled
-                st.rerun()
-        with col_auto:
-            auto_label = "⏱️ Auto" if st.session_state.auto_refresh else "⏸️ Stop"
-            auto_type = "primary" if st.session_state.auto_refresh else "secondary"
-            if st.button(auto_label, use_container_width=True, type=auto_type, help="Auto Refresh ON/OFF"):
-                st.session_state.auto_refresh = not st.session_state.auto_refresh
-                st.rerun()
-        
-        # Auto-refresh using streamlit-autorefresh
-        if st.session_state.auto_refresh:
-            # Auto refresh every 10 seconds (10000 ms)
-            refresh_count = st_autorefresh(interval=10000, limit=None, key="dashboard_refresh")
-            if refresh_count > 0:
-                load_orders.clear()  # Clear cache on refresh
-            st.caption(f"🟢 Auto-refresh ON (10s) | Refresh #{refresh_count}")
-        else:
-            st.caption("🔴 Auto-refresh OFF - Manual refresh သာ")
-        
-        # Show pending and preparing orders
-        active_orders = [o for o in orders if o.get('status') in ['pending', 'preparing']]
-        
-        if not active_orders:
-            st.info("📭 လက်ရှိ order မရှိပါ")
-        else:
-            for order in active_orders:  # Already sorted by timestamp desc
-                status_color = "🟡" if order['status'] == 'pending' else "🟠"
+        # Live အပိုင်း (sound + metrics + controls + active orders) - auto refresh ဆိုရင် ဒီ fragment ပဲ
+        # ၁၀ စက္ကန့်တိုင်း rerun (background, sales history, sidebar တွေ ပြန်မဆွဲ)။ Button တွေက st.rerun() နဲ့ app တစ်ခုလုံး
+        @st.fragment(run_every=10 if st.session_state.auto_refresh else None)
+        def _live_orders():
+            pending_orders, preparing_orders, _, active_orders, _ = bucket_orders(load_orders(store_id))
+            
+            # Check for new orders and play sound
+            pending_count = len(pending_orders)
+            if st.session_state.sound_enabled and pending_count > st.session_state.last_pending_count:
+                play_notification_sound()
+            st.session_state.last_pending_count = pending_count
+            
+            # Filter orders by status
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("⏳ Pending", pending_count)
+            with col2:
+                st.metric("👨‍🍳 Preparing", len(preparing_orders))
+            
+            st.divider()
+            
+            # Controls row
+            col_refresh, col_sound, col_auto = st.columns(3)
+            with col_refresh:
+                if st.button("🔄 Refresh", use_container_width=True):
+                    load_orders.clear()
+                    st.rerun()
+            with col_sound:
+                sound_label = "🔔" if st.session_state.sound_enabled else "🔕"
+                btn_type = "primary" if st.session_state.sound_enabled else "secondary"
+                if st.button(sound_label, use_container_width=True, type=btn_type, help="Sound ON/OFF"):
+                    st.session_state.sound_enabled = not st.session_state.sound_enabled
+                    st.rerun()
+            with col_auto:
+                auto_label = "⏱️ Auto" if st.session_state.auto_refresh else "⏸️ Stop"
+                auto_type = "primary" if st.session_state.auto_refresh else "secondary"
+                if st.button(auto_label, use_container_width=True, type=auto_type, help="Auto Refresh ON/OFF"):
+                    st.session_state.auto_refresh = not st.session_state.auto_refresh
+                    st.rerun()
+            
+            if st.session_state.auto_refresh:
+                st.caption("🟢 Auto-refresh ON (10s)")
+            else:
+                st.caption("🔴 Auto-refresh OFF - Manual refresh သာ")
+            
+            # Show pending and preparing orders
+            if not active_orders:
+                st.info("📭 လက်ရှိ order မရှိပါ")
+            else:
+                for order in active_orders:  # Already sorted by timestamp desc
+                    status_color = "🟡" if order['status'] == 'pending' else "🟠"
                 
-                with st.container(border=True):
-                    col1, col2 = st.columns([3, 1])
+                    with st.container(border=True):
+                        col1, col2 = st.columns([3, 1])
                     
-                    with col1:
-                        order_display_total = int(order.get('adjusted_total') or order['total'])
-                        st.markdown(f"### {status_color} Order #{order['order_id']}")
-                        st.markdown(f"**🪑 Table: {order['table_no']}**")
-                        st.markdown(f"**📝 Items:** {order['items']}")
-                        st.markdown(f"**💰 Total:** {format_price(order_display_total)} Ks" + (" _(မရနိုင်နုတ်ပြီး)_" if order.get('adjusted_total') else ""))
-                        st.caption(f"🕐 {order['timestamp']}")
-                        # ကုန်သွားသော ပစ္စည်း ရွေးပါ — admin နှိပ်မှ ပွင့်မယ် (refresh မှာ မပွင့်ဘူး)
-                        unav_str = (order.get('unavailable_items') or '').strip()
-                        unav_set = set(n.strip() for n in unav_str.replace('၊', ',').split(',') if n.strip())
-                        parsed = parse_order_items(order.get('items', ''))
-                        menu_items = load_menu_items(0, store_id)
-                        with st.expander("🔴 ပစ္စည်း ရနိုင်/မရနိုင် ရွေးပါ (နှိပ်ပါ)", expanded=False):
-                            st.caption(f"Order #{order['order_id']} | 🪑 Table {order['table_no']}")
-                            checked = []
-                            for idx, row in enumerate(parsed):
-                                display_text = row[0]
-                                item_name = row[1]
-                                qty = row[2] if len(row) > 2 else 1
-                                is_unav = st.checkbox(
-                                    f"မရနိုင် — {display_text}",
-                                    value=(item_name in unav_set),
-                                    key=f"unav_{order['order_id']}_{idx}"
-                                )
-                                if is_unav:
-                                    checked.append((item_name, qty))
-                            st.caption("မရနိုင် အမှန်ခြစ်ထားပြီး **Preparing** နှိပ်လိုက်ရင် Customer ဆီ ကုန်သွားပါပြီ တောင်ပန်းပါတယ် ပို့မည်။ Total မှ နုတ်မည်။ (သတင်းသိမ်း မလိုပါ။)")
+                        with col1:
+                            st.markdown(ORDER_CARD_HTML.format(
+                                emoji=status_color,
+                                order_id=html.escape(order['order_id']),
+                                table_no=html.escape(str(order['table_no'])),
+                                items=html.escape(order['items']),
+                                total=format_price(order['display_total_int'] or 0),
+                                adjusted_note=" <i>(မရနိုင်နုတ်ပြီး)</i>" if order.get('adjusted_total') else "",
+                                timestamp=html.escape(order['timestamp'])
+                            ), unsafe_allow_html=True)
+                            # ကုန်သွားသော ပစ္စည်း ရွေးပါ — admin နှိပ်မှ ပွင့်မယ် (refresh မှာ မပွင့်ဘူး)
+                            unav_str = (order.get('unavailable_items') or '').strip()
+                            unav_set = set(n.strip() for n in unav_str.replace('၊', ',').split(',') if n.strip())
+                            parsed = parse_order_items(order.get('items', ''))
+                            with st.expander("🔴 ပစ္စည်း ရနိုင်/မရနိုင် ရွေးပါ (နှိပ်ပါ)", expanded=False):
+                                st.caption(f"Order #{order['order_id']} | 🪑 Table {order['table_no']}")
+                                checked = []
+                                for idx, row in enumerate(parsed):
+                                    display_text = row[0]
+                                    item_name = row[1]
+                                    qty = row[2] if len(row) > 2 else 1
+                                    is_unav = st.checkbox(
+                                        f"မရနိုင် — {display_text}",
+                                        value=(item_name in unav_set),
+                                        key=f"unav_{order['order_id']}_{idx}"
+                                    )
+                                    if is_unav:
+                                        checked.append((item_name, qty))
+                                st.caption("မရနိုင် အမှန်ခြစ်ထားပြီး **Preparing** နှိပ်လိုက်ရင် Customer ဆီ ကုန်သွားပါပြီ တောင်ပန်းပါတယ် ပို့မည်။ Total မှ နုတ်မည်။ (သတင်းသိမ်း မလိုပါ။)")
                     
-                    with col2:
-                        if order['status'] == 'pending':
-                            if st.button("👨‍🍳 Preparing", key=f"prep_{order['order_id']}", use_container_width=True):
-                                # Preparing နှိပ်တဲ့အခါ လက်ရှိ မရနိုင် အမှန်ခြစ်ထားတာကို ယူပြီး order မှာ သိမ်း + status ပြောင်း (နောက် ၁ နာရီ/နောက်နေ့ စာရင်းမှ မပါ)
-                                unav_names = ", ".join(n for n, q in checked)
-                                try:
-                                    orig_total = int(order['total'])
-                                except:
-                                    orig_total = 0
-                                adjusted, _ = compute_adjusted_total(orig_total, menu_items, checked)
-                                update_order_unavailable(db, store_id, order['order_id'], unav_names, adjusted)
-                                update_order_status(db, store_id, order['order_id'], 'preparing')
-                                st.toast("Preparing ပြီး။ Customer ဆီ မရနိုင်သတင်း ပို့ပြီး Total နုတ်ပြီး။")
-                                st.rerun()
+                        with col2:
+                            if order['status'] == 'pending':
+                                if st.button("👨‍🍳 Preparing", key=f"prep_{order['order_id']}", use_container_width=True):
+                                    # Preparing နှိပ်တဲ့အခါ လက်ရှိ မရနိုင် အမှန်ခြစ်ထားတာကို ယူပြီး order မှာ သိမ်း + status ပြောင်း (နောက် ၁ နာရီ/နောက်နေ့ စာရင်းမှ မပါ)
+                                    unav_names = ", ".join(n for n, q in checked)
+                                    adjusted, _ = compute_adjusted_total(order['total_int'] or 0, items, checked)
+                                    update_order_unavailable(db, store_id, order['order_id'], unav_names, adjusted)
+                                    update_order_status(db, store_id, order['order_id'], 'preparing')
+                                    st.toast("Preparing ပြီး။ Customer ဆီ မရနိုင်သတင်း ပို့ပြီး Total နုတ်ပြီး။")
+                                    st.rerun()
                         
-                        if st.button("✅ Complete", key=f"done_{order['order_id']}", use_container_width=True, type="primary"):
-                            # Add to daily sales (use adjusted_total if customer had unavailable items)
-                            try:
-                                order_total = int(order.get('adjusted_total') or order['total'])
-                                add_to_daily_sales(db, store_id, order_total)
-                            except:
-                                pass
-                            # Mark as completed (keep for history)
-                            update_order_status(db, store_id, order['order_id'], 'completed')
-                            st.toast(f"✅ Order #{order['order_id']} ပြီးဆုံးပြီ!")
-                            st.rerun()
+                            if st.button("✅ Complete", key=f"done_{order['order_id']}", use_container_width=True, type="primary"):
+                                # Add to daily sales (use adjusted_total if customer had unavailable items)
+                                # Mark as completed (keep for history) + daily sales - one commit
+                                complete_order(db, store_id, order['order_id'], order['display_total_int'])
+                                st.toast(f"✅ Order #{order['order_id']} ပြီးဆုံးပြီ!")
+                                st.rerun()
+        
+        _live_orders()
         
         # ============================================
         # ORDER HISTORY
         # ============================================
         st.divider()
         
-        completed_orders = [o for o in orders if o.get('status') == 'completed']
-        
-        with st.expander(f"📋 Order History ({len(completed_orders)} orders)", expanded=False):
+        # အရေအတွက်နဲ့ ရှင်းတာက completed အားလုံး (load_orders က နောက်ဆုံး ORDERS_LOAD_LIMIT ခုပဲ)
+        completed_count = count_completed_orders(store_id) if completed_orders else 0
+        with st.expander(f"📋 Order History ({completed_count} orders)", expanded=False):
             if not completed_orders:
                 st.info("ပြီးဆုံးပြီးသော order မရှိသေးပါ")
             else:
-                # Filter by today only
-                today = datetime.now().strftime("%Y-%m-%d")
-                today_completed = [o for o in completed_orders if o.get('timestamp', '').startswith(today)]
-                
                 st.markdown(f"**📅 ယနေ့ ({today}) - {len(today_completed)} orders**")
                 
                 if today_completed:
@@ -1606,7 +2057,7 @@ def main():
                         with col3:
                             st.write(order['items'][:50] + "..." if len(order['items']) > 50 else order['items'])
                         with col4:
-                            st.write(f"💰 {format_price(int(order['total']))} Ks")
+                            st.write(f"💰 {format_price(order['total_int'] or 0)} Ks")
                         st.divider()
                 else:
                     st.info("ယနေ့ ပြီးဆုံးသော order မရှိသေးပါ")
@@ -1618,11 +2069,10 @@ def main():
                     if st.button("🗑️ History ရှင်းမည်", use_container_width=True):
                         st.session_state.confirm_clear_history = True
                 
-                if st.session_state.get('confirm_clear_history'):
+                if st.session_state.confirm_clear_history:
                     with col_confirm:
                         if st.button("⚠️ အတည်ပြု", use_container_width=True, type="primary"):
-                            for order in completed_orders:
-                                delete_order(db, store_id, order['order_id'])
+                            delete_completed_orders(db, store_id)
                             st.session_state.confirm_clear_history = False
                             st.toast("✅ History ရှင်းပြီးပါပြီ")
                             st.rerun()
@@ -1631,7 +2081,7 @@ def main():
         st.divider()
         with st.expander("⚠️ စမ်းသပ်အတွက် History ပြန်ဖျက်မည်", expanded=False):
             st.caption("Order History နဲ့ နေ့စဉ်ရောင်းရငွေ စာရင်း အားလုံး ဖျက်ပစ်မယ်။ စမ်းနေတဲ့အခါသာ သုံးပါ။")
-            if not st.session_state.get('confirm_clear_all_history'):
+            if not st.session_state.confirm_clear_all_history:
                 if st.button("🗑️ History အားလုံး ပြန်ဖျက်မည်", use_container_width=True, type="secondary"):
                     st.session_state.confirm_clear_all_history = True
                     st.rerun()
@@ -1641,8 +2091,7 @@ def main():
                 with c1:
                     if st.button("✅ ဟုတ်ကဲ့ ဖျက်မည်", use_container_width=True, type="primary"):
                         # Order History ဖျက်
-                        for order in completed_orders:
-                            delete_order(db, store_id, order['order_id'])
+                        delete_completed_orders(db, store_id)
                         # နေ့စဉ်ရောင်းရငွေ ဖျက်
                         sales_deleted = clear_all_daily_sales(db, store_id)
                         st.session_state.confirm_clear_all_history = False
@@ -1660,46 +2109,8 @@ def main():
     # Apply background (အရောင် + နောက်ခံပုံ ချိန်းထားရင် ပြ)
     bg_color = current_store.get('bg_color', '') or '#e8edd5'  # default: light greenish-yellow
     bg_image = (current_store.get('bg_image') or '').strip()
-    bg_image_css = ''
-    if bg_image and bg_image.startswith('data:'):
-        # CSS url() ထဲ ထည့်ရင် " နဲ့ \ escape
-        bg_esc = bg_image.replace('\\', '\\\\').replace('"', '\\"')
-        bg_image_css = f"""
-        background-image: url("{bg_esc}") !important;
-        background-size: cover !important;
-        background-position: center !important;
-        background-attachment: fixed !important;
-        """
-    st.markdown(f"""
-    <style>
-    .stApp {{
-        background-color: {bg_color} !important;
-        {bg_image_css}
-        padding-top: 0 !important;
-    }}
-    [data-testid="stAppViewContainer"] {{
-        padding-top: 0.5rem !important;
-    }}
-    [data-testid="stSidebar"] > div:first-child {{
-        background-color: {bg_color} !important;
-        {bg_image_css}
-    }}
-    header[data-testid="stHeader"], [data-testid="stHeader"], header {{
-        background-color: {bg_color} !important;
-    }}
-    .block-container {{
-        padding-top: 0.5rem !important;
-        max-width: 100%;
-        overflow: visible !important;
-    }}
-    [data-testid="stMarkdown"]:has(.header-wrapper-outer) {{ overflow: visible !important; max-width: none !important; }}
-    </style>
-    """, unsafe_allow_html=True)
-    
     # မြန်မာဖောင့် ပြောင်းလို့ရအောင် Google Fonts မှ သွင်း (Noto Sans Myanmar, Padauk) — စက်မှာ မထည့်ထားလည်း ပြောင်းမယ်
-    st.markdown("""
-    <link href="https://fonts.googleapis.com/css2?family=Noto+Sans+Myanmar:wght@400;700&family=Padauk:wght@400;700&display=swap" rel="stylesheet">
-    """, unsafe_allow_html=True)
+    fonts_link = '<link href="https://fonts.googleapis.com/css2?family=Noto+Sans+Myanmar:wght@400;700&family=Padauk:wght@400;700&display=swap" rel="stylesheet">'
     # ဆိုင်ပုံ/logoပြပါ — ဆိုင်အမည်နဲ့ subtitle ပဲ ပြ (Super Admin က ပြင်ထားတဲ့ font/size/color သုံး)
     _tit_font = current_store.get('header_title_font_style') or 'sans-serif'
     _tit_size = current_store.get('header_title_font_size') or '3em'
@@ -1707,62 +2118,49 @@ def main():
     _sub_font = current_store.get('header_subtitle_font_style') or 'sans-serif'
     _sub_size = current_store.get('header_subtitle_font_size') or '1.5em'
     _sub_color = current_store.get('header_subtitle_color') or COLORS["header_subtitle"]
-    st.markdown(f"""
-    <style>
-    /* ခေါင်းစဉ် ဖြတ်မပြအောင် Streamlit content width ကို ကျော်ပြီး viewport အပြည့် နေရာယူ */
-    .header-wrapper-outer {{
-        width: 100vw;
-        position: relative;
-        left: 50%;
-        right: 50%;
-        margin-left: -50vw !important;
-        margin-right: -50vw !important;
-        overflow: visible !important;
-        box-sizing: border-box;
-    }}
-    .header-container {{
-        text-align: center;
-        padding: 14px 0 12px 0;
-        width: 100%;
-        max-width: 100%;
-        overflow: visible !important;
-        box-sizing: border-box;
-    }}
-    /* မြန်မာစာ အမြင့်သရ/အမှတ် မဖြတ်အောင် line-height နဲ့ padding */
-    .header-title {{
-        font-family: {_tit_font};
-        font-size: {_tit_size};
-        font-weight: bold;
-        color: {_tit_color};
-        margin: 10px 0 5px 0;
-        white-space: normal;
-        word-wrap: break-word;
-        overflow-wrap: break-word;
-        overflow: visible !important;
-        max-width: 100%;
-        line-height: 1.5 !important;
-        padding-top: 0.2em;
-        padding-bottom: 0.1em;
-    }}
-    .header-subtitle {{
-        font-family: {_sub_font};
-        font-size: {_sub_size};
-        font-weight: bold;
-        color: {_sub_color};
-        letter-spacing: 3px;
-        line-height: 1.4;
-    }}
-    </style>
+    # Background + font + header - element တစ်ခုတည်း (markdown call ၃ ခု မခွဲ)
+    st.markdown(_bg_css(bg_color, bg_image) + fonts_link + _header_css(_tit_font, _tit_size, _tit_color, _sub_font, _sub_size, _sub_color) + f"""
     <div class="header-wrapper-outer">
         <div class="header-container">
-            <div class="header-title">{html.escape(current_store['store_name'])}</div>
-            <div class="header-subtitle">{html.escape(current_store.get('subtitle', 'Food & Drinks'))}</div>
+            <div class="header-title">{current_store['store_name_html']}</div>
+            <div class="header-subtitle">{current_store['subtitle_html']}</div>
         </div>
     </div>
     """, unsafe_allow_html=True)
     
+    # Admin/customer ကို တစ်ခါပဲ ခွဲ - အောက်က customer-only အပိုင်းတွေ (order noti, cart, styler, refresh) admin မှာ အကုန်ကျော်
+    is_customer = not st.session_state.is_admin
+    
+    # Background order write ပြီးရင် စစ် - fail ဖြစ်ရင် success ကို ပြန်ဖျက်ပြီး cart ပြန်ထည့်
+    pending_order = st.session_state.pending_order if is_customer else None
+    if pending_order and pending_order['future'].done():
+        st.session_state.pending_order = None
+        if pending_order['future'].exception() is not None:
+            if current_store:
+                unwatch_order(current_store['store_id'], pending_order['order_id'])
+            if st.session_state.order_success and st.session_state.order_success['order_id'] == pending_order['order_id']:
+                st.session_state.order_success = None
+            if st.session_state.last_order_id == pending_order['order_id']:
+                st.session_state.last_order_id = None
+            # ပို့ပြီးနောက် cart အသစ် စထားရင် မပျောက်အောင် ပြန်ပေါင်း (ရှိပြီးသား item ဆို qty တိုး)
+            cart = st.session_state.cart
+            for iid, entry in pending_order['cart'].items():
+                current = cart.get(iid)
+                if current:
+                    current['qty'] += entry['qty']
+                    current['line'] = f"{current['name']} x{current['qty']}"
+                else:
+                    cart[iid] = entry
+            st.session_state.cart_total = sum(e['price_int'] * e['qty'] for e in cart.values())
+            st.error("⚠️ Order ပို့လို့ မရပါ - ထပ်ပို့ပေးပါ")
+    # Write မပြီးသေးတဲ့ order - doc မရှိသေးလို့ status None ဖြစ်နေလည်း pending လို့ ယူ (tracking/refresh မရပ်အောင်)
+    inflight_order_id = st.session_state.pending_order['order_id'] if is_customer and st.session_state.pending_order else None
+    
+    track_status = None  # customer order status - အောက်ဆုံးမှာ refresh တစ်နေရာတည်းက သုံး
+    tracked_order_id = None  # track_status က ဘယ် order အတွက်လဲ (status ထပ်မရှာရအောင်)
+    
     # Show order success alert (ပြင်ဆင်နေပါပြီ noti ရောက်ရင် ဒီ box ပျောက်မယ်)
-    if st.session_state.order_success and not st.session_state.is_admin:
+    if is_customer and st.session_state.order_success:
         # Noti တက်တာနဲ့ စာမျက်နှာ အပေါ်ဆုံး လိမ့်စေ — SMS/noti ချက်ချင်းမြင်ရအောင်
         components.html("""
         <script>
@@ -1788,42 +2186,36 @@ def main():
         order_info = st.session_state.order_success
         order_doc = get_order_doc(db, current_store['store_id'], order_info['order_id']) if current_store else None
         order_status = order_doc.get('status') if order_doc else None
+        if order_status is None and order_info['order_id'] == inflight_order_id:
+            order_status = 'pending'
+        # Pending/Preparing ဆို listener က status ပို့ပေးမယ် (autorefresh က snapshot ကိုပဲ ပြန်ဖတ်)
+        if current_store:
+            if order_status in ('pending', 'preparing'):
+                watch_order(db, current_store['store_id'], order_info['order_id'])
+            else:
+                unwatch_order(current_store['store_id'], order_info['order_id'])
         unavailable_items = (order_doc.get('unavailable_items') or '').strip() if order_doc else ''
         adjusted_total = order_doc.get('adjusted_total') if order_doc else None
         display_total = int(adjusted_total) if adjusted_total is not None else order_info['total']
         
-        # Customer order status စစ်ဖို့ refresh — pending မှာ ၆ စက္ကန့် (Admin Complete မြန်မြန် ပြန့်အောင်)
-        if order_status == 'pending':
-            st_autorefresh(interval=6000, limit=None, key="customer_order_track")  # ၆ စက္ကန့်
-        elif order_status == 'preparing':
-            st_autorefresh(interval=20000, limit=None, key="customer_order_track")
+        track_status = order_status
+        tracked_order_id = order_info['order_id']
         
         # အနီရောင် noti ဖယ်ထား — မရနိုင်သတင်းက အဝါ box ထဲမှာပဲ ပြီးသား
         # စိမ်းရောင် "Order ပို့ပြီးပါပြီ!" box - pending ပဲ ပြ။ preparing/completed ရောက်ရင် မပြ (စုစုပေါင်း = adjusted ရှိရင် ပြ)
         if order_status not in ('preparing', 'completed'):
-            st.markdown(f"""
-            <div style="background: linear-gradient(135deg, #28a745 0%, #20c997 100%); 
-                        padding: 25px; border-radius: 15px; text-align: center; margin: 20px 0;
-                        box-shadow: 0 4px 15px rgba(40, 167, 69, 0.3);">
-                <div style="display: flex; align-items: center; justify-content: center; gap: 10px; margin-bottom: 10px;">
-                    <span style="font-size: 1.8em;">✅</span>
-                    <span style="color: #fff; font-size: 1.5em; font-weight: bold;">Order ပို့ပြီးပါပြီ!</span>
-                </div>
-                <div style="color: #fff; font-size: 1em; opacity: 0.95; margin-top: 8px;">
-                    🪑 table: {order_info['table_no']} &nbsp;&nbsp;&nbsp;&nbsp;|&nbsp;&nbsp;&nbsp;&nbsp; amount: {format_price(display_total)} Ks
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(order_sent_box_html(order_info['table_no'], display_total), unsafe_allow_html=True)
         
         # Show status to customer when admin updates (Preparing / Completed) — အဝါရောင် box (အကုန်ရရင်/မရရင် နှစ်မျိုးလုံး မပျက်အောင်)
         if order_status == 'preparing':
             table_amt = f'Table: {html.escape(str(order_info["table_no"]))} | Amount: {format_price(display_total)} Ks'
-            if unavailable_items:
-                unav_esc = html.escape(unavailable_items)
-                inner = f'<div style="color:#fff;font-size:1.3em;font-weight:bold;">သင့် order ပြင်ဆင်နေပါပြီး!</div><div style="color:#fff;font-size:1em;margin-top:8px;"><span style="color:#dc3545;font-weight:bold;">{unav_esc}</span> မရနိုင်လို့ တောင်းပန်ပါတယ်။</div><div style="color:#fff;font-size:1em;margin-top:8px;">{table_amt}</div><div style="color:#fff;font-size:0.95em;opacity:0.95;margin-top:8px;">မကြာမီ ရောက်လာပါမည်။</div>'
-            else:
-                inner = f'<div style="color:#fff;font-size:1.3em;font-weight:bold;">သင့် order ပြင်ဆင်နေပါပြီး!</div><div style="color:#fff;font-size:1em;margin-top:8px;">{table_amt}</div><div style="color:#fff;font-size:0.95em;opacity:0.95;margin-top:8px;">မကြာမီ ရောက်လာပါမည်။</div>'
-            box_html = '<div style="background:linear-gradient(135deg,#f0ad4e 0%,#ec971f 100%);padding:18px;border-radius:12px;text-align:center;margin:15px 0;box-shadow:0 3px 12px rgba(240,173,78,0.4);"><div style="font-size:2em;margin-bottom:5px;">👨‍🍳</div>' + inner + '</div>'
+            unav_line = f'<div class="ob-line"><span class="ob-unav">{html.escape(unavailable_items)}</span> မရနိုင်လို့ တောင်းပန်ပါတယ်။</div>' if unavailable_items else ''
+            box_html = (
+                '<div class="order-box order-box-preparing"><div class="ob-chef">👨‍🍳</div>'
+                '<div class="ob-subtitle">သင့် order ပြင်ဆင်နေပါပြီး!</div>'
+                f'{unav_line}<div class="ob-line">{table_amt}</div>'
+                '<div class="ob-note">မကြာမီ ရောက်လာပါမည်။</div></div>'
+            )
             st.markdown(box_html, unsafe_allow_html=True)
             # ပြင်ဆင်နေပါပြီ noti အသံ - တစ်ကြိမ်ပဲ (localStorage နဲ့ စစ်ပြီး refresh ဖြစ်လည်း မထပ်အောင်)
             oid = order_info['order_id']
@@ -1854,12 +2246,7 @@ def main():
                 </script>
             """, height=0)
         elif order_status == 'completed':
-            st.markdown("""
-            <div style="background: linear-gradient(135deg, #5bc0de 0%, #46b8da 100%); 
-                        padding: 18px; border-radius: 12px; text-align: center; margin: 15px 0;">
-                <div style="color: #fff; font-size: 1.2em; font-weight: bold;">✅ ပြီးပါပြီ။ ကျေးဇူးတင်ပါတယ်။</div>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown('<div class="order-box order-box-done"><div class="ob-done">✅ ပြီးပါပြီ။ ကျေးဇူးတင်ပါတယ်။</div></div>', unsafe_allow_html=True)
             # Admin Complete နှိပ်ပြီး customer ဘက် noti သံ — တစ်ကြိမ်ပဲ (localStorage)
             oid_complete = order_info['order_id']
             components.html(f"""
@@ -1922,41 +2309,37 @@ def main():
         
         # Button to dismiss and order more
         if st.button("🍽️ ထပ်မှာမည်", use_container_width=True, type="primary"):
+            unwatch_order(current_store['store_id'], order_info['order_id'])
             st.session_state.order_success = None
             st.rerun()
         
         st.divider()
     
     # Show table number if set
-    if st.session_state.table_no and not st.session_state.is_admin and not st.session_state.order_success:
+    if is_customer and st.session_state.table_no and not st.session_state.order_success:
         st.info(f"🪑 စားပွဲနံပါတ်: **{st.session_state.table_no}**")
     
     # Customer: show "preparing" notification when admin clicked Preparing for their order
-    if not st.session_state.is_admin and st.session_state.last_order_id and current_store:
-        orders_for_status = load_orders(db_id, store_id)
-        my_order = next((o for o in orders_for_status if o.get('order_id') == st.session_state.last_order_id), None)
-        status = my_order.get('status') if my_order else None
+    if is_customer and st.session_state.last_order_id and current_store:
+        last_order_id = st.session_state.last_order_id
+        if last_order_id == tracked_order_id:
+            status = track_status  # order_success block က ဖတ်ပြီးသား - orders ထပ်မဖတ်
+        else:
+            status = next((o.get('status') for o in load_orders(store_id) if o.get('order_id') == last_order_id), None)
+            if status is None and last_order_id == inflight_order_id:
+                status = 'pending'
 
-        if my_order is None:
-            st.session_state.last_order_id = None
-        elif status == 'completed':
+        if status in (None, 'completed'):
             st.session_state.last_order_id = None
-        elif status == 'preparing':
-            load_orders.clear()
-            st_autorefresh(interval=20000, limit=None, key="customer_preparing_refresh")
-        elif status == 'pending':
-            load_orders.clear()
-            st_autorefresh(interval=6000, limit=None, key="customer_preparing_refresh")  # ၆ စက္ကန့် (Complete မြန်မြန် ပြန့်အောင်)
-    
-    categories = load_categories(db_id, store_id)
-    items = load_menu_items(db_id, store_id)
+        track_status = track_status or status
     
-    cat_names = [c['category_name'] for c in categories]
-    category_items = {cat: [] for cat in cat_names}
+    cat_names, cat_by_name = index_categories(categories)
+    # One pass, one hash per item - unknown categories simply never get emitted
+    category_items = defaultdict(list)
     for item in items:
-        cat = item.get('category', '')
-        if cat in category_items:
-            category_items[cat].append(item)
+        category_items[item.get('category', '')].append(item)
+    # Item ရှိတဲ့ category တွေပဲ (admin စီထားတဲ့ category အစီအစဉ်အတိုင်း) - key ရှိရင် list မလွတ်
+    active_cats = [cat for cat in cat_names if cat in category_items]
     
     if not items and not categories:
         st.info("ℹ️ ပစ္စည်းမရှိသေးပါ။ Admin Login ဝင်ပြီး ထည့်ပါ။")
@@ -1976,6 +2359,27 @@ def main():
             font-weight: 600;
             margin: 10px 0 15px 0;
         }}
+        /* Item row - name ....... price */
+        .item-row {{
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            margin-bottom: 10px;
+        }}
+        .item-row .item-name {{
+            font-weight: 600;
+            color: #333;
+        }}
+        .item-row .item-dots {{
+            flex: 1;
+            border-bottom: 2px dotted #ccc;
+            margin: 0 10px;
+        }}
+        .item-row .item-price {{
+            color: #1E90FF;
+            font-weight: 600;
+            white-space: nowrap;
+        }}
         </style>
         """, unsafe_allow_html=True)
         
@@ -1985,9 +2389,6 @@ def main():
         # Category အသစ်တွေက အောက်မှာ row အသစ်နဲ့ ဆက်သွားမည်
         # ============================================
         
-        # Filter categories that have items
-        active_cats = [cat for cat in cat_names if category_items.get(cat)]
-        
         # Display categories in 4-column rows
         num_cols = 4
         for row_start in range(0, len(active_cats), num_cols):
@@ -1999,24 +2400,18 @@ def main():
             for col_idx, col in enumerate(cols):
                 if col_idx < len(row_cats):
                     cat = row_cats[col_idx]
-                    cat_items = category_items.get(cat, [])
+                    cat_items = category_items[cat]
                     
                     with col:
                         # Category header
-                        st.markdown(f'<div class="cat-header">{html.escape(cat)}</div>', unsafe_allow_html=True)
+                        st.markdown(f'<div class="cat-header">{cat_by_name[cat]["category_name_html"]}</div>', unsafe_allow_html=True)
                         
                         # Items in this category (vertical list)
                         for item in cat_items:
-                            if st.session_state.is_admin:
+                            if not is_customer:
                                 # Admin view - with border, item...dots...price
                                 with st.container(border=True):
-                                    st.markdown(f'''
-                                    <div style="display:flex; justify-content:space-between; align-items:center; margin-bottom:10px;">
-                                        <span style="font-weight:600; color:#333;">{html.escape(item['name'])}</span>
-                                        <span style="flex:1; border-bottom:2px dotted #ccc; margin:0 10px;"></span>
-                                        <span style="color:#1E90FF; font-weight:600; white-space:nowrap;">{item['price']} Ks</span>
-                                    </div>
-                                    ''', unsafe_allow_html=True)
+                                    st.markdown(ITEM_ROW_HTML.format(name=item['name_html'], price=item['price_html']), unsafe_allow_html=True)
                                     
                                     btn_col1, btn_col2 = st.columns(2)
                                     with btn_col1:
@@ -2030,35 +2425,13 @@ def main():
                             else:
                                 # Customer view - Item...dots...Price, ADD below left
                                 with st.container(border=True):
-                                    st.markdown(f'''
-                                    <div style="display:flex; justify-content:space-between; align-items:center; margin-bottom:10px;">
-                                        <span style="font-weight:600; color:#333;">{html.escape(item['name'])}</span>
-                                        <span style="flex:1; border-bottom:2px dotted #ccc; margin:0 10px;"></span>
-                                        <span style="color:#1E90FF; font-weight:600; white-space:nowrap;">{item['price']} Ks</span>
-                                    </div>
-                                    ''', unsafe_allow_html=True)
+                                    st.markdown(ITEM_ROW_HTML.format(name=item['name_html'], price=item['price_html']), unsafe_allow_html=True)
                                     # ADD button below, left aligned (red/orange)
-                                    clicked = st.button("ADD", key=f"add_{item['item_id']}", type="secondary")
-                                if clicked:
-                                    # Check if item already in cart
-                                    found = False
-                                    for cart_item in st.session_state.cart:
-                                        if cart_item['item_id'] == item['item_id']:
-                                            cart_item['qty'] += 1
-                                            found = True
-                                            break
-                                    
-                                    if not found:
-                                        st.session_state.cart.append({
-                                            'item_id': item['item_id'],
-                                            'name': item['name'],
-                                            'price': item['price'],
-                                            'qty': 1
-                                        })
-                                    st.rerun()
+                                    st.button("ADD", key=f"add_{item['item_id']}", type="secondary",
+                                              on_click=_cart_add, args=(item,))
                             
                             # Edit form for admin
-                            if st.session_state.is_admin and st.session_state.editing_id == item['item_id']:
+                            if not is_customer and st.session_state.editing_id == item['item_id']:
                                 with st.form(f"edit_{item['item_id']}"):
                                     new_name = st.text_input("အမည်", value=item['name'])
                                     new_price = st.text_input("ဈေးနှုန်း", value=str(item['price']))
@@ -2088,34 +2461,28 @@ def main():
     # ============================================
     # CUSTOMER CART (Bottom of page for mobile)
     # ============================================
-    if not st.session_state.is_admin and st.session_state.cart:
+    if is_customer and st.session_state.cart:
         st.divider()
         st.markdown("### 🛒 မှာထားသောပစ္စည်းများ")
         
         
-        total = 0
-        for i, item in enumerate(st.session_state.cart):
-            price = parse_price(item['price'])
-            total += price * item['qty']
+        total = st.session_state.cart_total
+        for iid, item in st.session_state.cart.items():
             
             with st.container(border=True):
                 # Item name and price with dots
-                st.markdown(f'''
-                <div style="display:flex; justify-content:space-between; align-items:center; margin-bottom:8px;">
-                    <span style="font-weight:600; color:#333;">{html.escape(item['name'])}</span>
-                    <span style="flex:1; border-bottom:2px dotted #ccc; margin:0 10px;"></span>
-                    <span style="color:#1E90FF; font-weight:600;">{item['price']} Ks</span>
-                </div>
-                ''', unsafe_allow_html=True)
+                st.markdown(ITEM_ROW_HTML.format(name=item['name_html'], price=item['price_html']), unsafe_allow_html=True)
                 
                 # Quantity control: ➖ [qty] ➕ 🗑️ - aligned left, same size
-                b1, b2, b3, b4, b5, b6 = st.columns([1, 1, 1, 0.3, 1, 2.7])
+                # Spacer column မသုံး - Cancel အကွာကို styler ရဲ့ margin နဲ့ပေး
+                b1, b2, b3, b4 = st.columns(4)
                 with b1:
-                    minus_clicked = st.button("➖", key=f"minus_{i}", use_container_width=True)
+                    st.button("➖", key=f"minus_{iid}", use_container_width=True,
+                              on_click=_cart_change_qty, args=(iid, -1))
                 with b2:
                     # Display quantity - same size as buttons, no border
                     st.markdown(f'''
-                    <div style="display:flex; align-items:center; justify-content:center; 
+                    <div class="qty-display" data-price="{item['price_int']}" data-qty="{item['qty']}" style="display:flex; align-items:center; justify-content:center; 
                                 background:transparent; border:none;
                                 height:48px; width:100%; box-sizing:border-box;
                                 font-size:20px; font-weight:bold; color:#333;">
@@ -2123,194 +2490,47 @@ def main():
                     </div>
                     ''', unsafe_allow_html=True)
                 with b3:
-                    plus_clicked = st.button("➕", key=f"plus_{i}", use_container_width=True)
+                    st.button("➕", key=f"plus_{iid}", use_container_width=True,
+                              on_click=_cart_change_qty, args=(iid, 1))
                 with b4:
-                    st.empty()  # Spacer between + and delete
-                with b5:
-                    del_clicked = st.button("Cancel", key=f"remove_{i}", use_container_width=True)
-                with b6:
-                    st.empty()
-                
-                # Handle button clicks
-                if minus_clicked:
-                    if st.session_state.cart[i]['qty'] > 1:
-                        st.session_state.cart[i]['qty'] -= 1
-                    else:
-                        st.session_state.cart.pop(i)
-                    st.rerun()
-                if plus_clicked:
-                    st.session_state.cart[i]['qty'] += 1
-                    st.rerun()
-                if del_clicked:
-                    st.session_state.cart.pop(i)
-                    st.rerun()
+                    st.button("Cancel", key=f"remove_{iid}", use_container_width=True,
+                              on_click=_cart_remove, args=(iid,))
         
-        # Inject JavaScript to style quantity buttons (using components.html to run JS)
-        # Colors from COLORS config
-        minus_color = COLORS["minus_btn"]
-        plus_color = COLORS["plus_btn"]
-        delete_color = COLORS["delete_btn"]
-        
-        components.html(f"""
-        <script>
-            function styleQtyButtons() {{
-                var doc = parent.document;
-                if (!doc) return;
-                
-                doc.querySelectorAll('button').forEach(function(btn) {{
-                    var text = btn.textContent || btn.innerText || '';
-                    
-                    // ➖ ➕ buttons - no color (default/light grey)
-                    if (text.indexOf('➖') !== -1 || text.indexOf('➕') !== -1) {{
-                        btn.style.setProperty('background', '#f0f2f6', 'important');
-                        btn.style.setProperty('color', '#333', 'important');
-                        btn.style.setProperty('border', '1px solid #ccc', 'important');
-                        btn.style.setProperty('border-radius', '12px', 'important');
-                        btn.style.setProperty('min-height', '48px', 'important');
-                        btn.style.setProperty('min-width', '50px', 'important');
-                        btn.style.setProperty('font-size', '18px', 'important');
-                    }}
-                    
-                    // Cancel button - bold text
-                    if (text.indexOf('Cancel') !== -1) {{
-                        btn.style.setProperty('background', '#f0f2f6', 'important');
-                        btn.style.setProperty('color', '#333', 'important');
-                        btn.style.setProperty('border', '1px solid #ccc', 'important');
-                        btn.style.setProperty('border-radius', '12px', 'important');
-                        btn.style.setProperty('min-height', '48px', 'important');
-                        btn.style.setProperty('min-width', '50px', 'important');
-                        btn.style.setProperty('font-size', '16px', 'important');
-                        btn.style.setProperty('font-weight', 'bold', 'important');
-                        // Also style the p element inside button
-                        var pTag = btn.querySelector('p');
-                        if (pTag) {{
-                            pTag.style.setProperty('font-weight', 'bold', 'important');
-                            pTag.style.setProperty('color', '#333', 'important');
-                        }}
-                    }}
-                }});
-                
-                // Fix column layout - aligned left with small gap
-                doc.querySelectorAll('[data-testid="stHorizontalBlock"]').forEach(function(block) {{
-                    var html = block.innerHTML || '';
-                    if (html.indexOf('➖') !== -1 && html.indexOf('➕') !== -1) {{
-                        block.style.display = 'flex';
-                        block.style.flexWrap = 'nowrap';
-                        block.style.gap = '8px';
-                        block.style.justifyContent = 'flex-start';
-                        
-                        var children = block.children;
-                        for (var i = 0; i < children.length; i++) {{
-                            children[i].style.flex = 'none';
-                            children[i].style.width = 'auto';
-                            children[i].style.padding = '0';
-                            children[i].style.minWidth = '0';
-                        }}
-                    }}
-                    
-                    // Cart & Order buttons - separate borders, small gap, left aligned
-                    if (html.indexOf('Cart') !== -1 && html.indexOf('Order') !== -1) {{
-                        block.style.display = 'flex';
-                        block.style.flexWrap = 'nowrap';
-                        block.style.gap = '10px';
-                        block.style.justifyContent = 'flex-start';
-                        
-                        var children = block.children;
-                        for (var i = 0; i < children.length; i++) {{
-                            children[i].style.flex = 'none';
-                            children[i].style.width = 'auto';
-                            children[i].style.padding = '0';
-                            children[i].style.minWidth = '0';
-                        }}
-                    }}
-                }});
-                
-                // Style Cart & Order buttons - separate borders, same size
-                doc.querySelectorAll('button').forEach(function(btn) {{
-                    var text = btn.textContent || btn.innerText || '';
-                    
-                    // Cart button - fully rounded, own border
-                    if (text.indexOf('Cart') !== -1) {{
-                        btn.style.setProperty('background', '#f0f2f6', 'important');
-                        btn.style.setProperty('color', '#333', 'important');
-                        btn.style.setProperty('border', '2px solid #333', 'important');
-                        btn.style.setProperty('border-radius', '25px', 'important');
-                        btn.style.setProperty('padding', '12px 25px', 'important');
-                        btn.style.setProperty('min-width', '160px', 'important');
-                        btn.style.setProperty('min-height', '50px', 'important');
-                        btn.style.setProperty('font-weight', 'bold', 'important');
-                        var pTag = btn.querySelector('p');
-                        if (pTag) {{
-                            pTag.style.setProperty('font-weight', 'bold', 'important');
-                            pTag.style.setProperty('color', '#333', 'important');
-                        }}
-                    }}
-                    
-                    // Order button - fully rounded, own border
-                    if (text.indexOf('Order') !== -1) {{
-                        btn.style.setProperty('background', 'linear-gradient(90deg, #2E8B57 0%, #9ACD32 100%)', 'important');
-                        btn.style.setProperty('color', 'white', 'important');
-                        btn.style.setProperty('border', '2px solid #333', 'important');
-                        btn.style.setProperty('border-radius', '25px', 'important');
-                        btn.style.setProperty('padding', '12px 25px', 'important');
-                        btn.style.setProperty('min-width', '160px', 'important');
-                        btn.style.setProperty('min-height', '50px', 'important');
-                        btn.style.setProperty('font-weight', 'bold', 'important');
-                        var pTag = btn.querySelector('p');
-                        if (pTag) {{
-                            pTag.style.setProperty('font-weight', 'bold', 'important');
-                            pTag.style.setProperty('color', 'white', 'important');
-                        }}
-                    }}
-                }});
-            }}
-            
-            // Run multiple times
-            styleQtyButtons();
-            setTimeout(styleQtyButtons, 100);
-            setTimeout(styleQtyButtons, 300);
-            setTimeout(styleQtyButtons, 500);
-            setInterval(styleQtyButtons, 800);
-        </script>
-        """, height=0)
+        # Quantity/Cart/Order button styler - static string ဖြစ်လို့ rerun တိုင်း iframe အသစ် မဆောက် (observer က ဆက်စောင့်)
+        if not USE_NATIVE_THEME:
+            components.html(QTY_BUTTON_STYLER_HTML, height=0)
         
         # Total and Order Section
-        st.markdown(f"""
-        <div style="background: linear-gradient(135deg, {COLORS["total_bg_start"]} 0%, {COLORS["total_bg_end"]} 100%); 
-                    padding: 15px; border-radius: 10px; text-align: center; margin: 15px 0;">
-            <div style="color: #fff; font-size: 1.5em; font-weight: bold;">
-                💰 Total: {format_price(total)} Ks
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(CART_TOTAL_HTML.format(total=format_price(total), total_raw=total), unsafe_allow_html=True)
         
         # ခလုတ်များ ဦးစွာပြ (order_submit ရအောင်) → ပြီးမှ process → ပို့ပြီး အသံ ထွက်အောင် မပြန်တင်ဘဲ ပြမယ်
-        st.markdown('<div class="cart-order-marker"></div>', unsafe_allow_html=True)
-        cart_col, order_col, empty_col = st.columns([1, 1, 1])
+        cart_col, order_col = st.columns(2)  # CSS က auto width / left aligned ပေး - spacer column မလို
         with cart_col:
-            cart_clear = st.button("🗑️ Cart ရှင်းမည်", use_container_width=True, key="cart_clear_btn")
+            st.button("🗑️ Cart ရှင်းမည်", use_container_width=True, key="cart_clear_btn", on_click=_cart_clear)
         with order_col:
             order_submit = st.button("📤 Order ပို့မည်", use_container_width=True, type="primary", key="order_submit_btn")
-        with empty_col:
-            st.empty()
         
         # Process: Order ပို့ပြီး အသံ ထွက်အောင် ဒီ run မှာပဲြပြီး မပြန်တင်ဘူး (browser autoplay အတွက်)
-        if order_submit and st.session_state.table_no and current_store:
-            items_str = " | ".join([f"{item['name']} x{item['qty']}" for item in st.session_state.cart])
-            with st.spinner("📤 Order ပို့နေပါသည်..."):
-                order_id = save_order(db, current_store['store_id'], {
-                    'table_no': st.session_state.table_no,
-                    'items': items_str,
-                    'total': str(total)
-                })
+        table_no = st.session_state.table_no
+        if order_submit and table_no and current_store:
+            cart = st.session_state.cart
+            items_str = " | ".join(item['line'] for item in cart.values())
+            # Optimistic - success ကို ချက်ချင်းပြ၊ Firestore write က background (fail ရင် နောက် run မှာ rollback)
+            order_id, future = save_order_async(db, current_store['store_id'], {
+                'table_no': table_no,
+                'items': items_str,
+                'total': str(total)
+            })
+            st.session_state.pending_order = {'order_id': order_id, 'future': future, 'cart': cart}
+            watch_order(db, current_store['store_id'], order_id)
             st.session_state.order_success = {
                 'order_id': order_id,
-                'table_no': st.session_state.table_no,
+                'table_no': table_no,
                 'total': total,
                 'items': items_str
             }
             st.session_state.last_order_id = order_id
-            st.session_state.cart = []
+            _cart_clear()
             components.html("""
             <script>
                 (function(){
@@ -2334,15 +2554,11 @@ def main():
             </script>
             """, height=0)
             st.balloons()
-        elif order_submit and not st.session_state.table_no:
+        elif order_submit and not table_no:
             st.error("⚠️ စားပွဲနံပါတ် ထည့်ပါ")
         elif order_submit and not current_store:
             st.error("⚠️ ဆိုင်ရွေးပါ")
         
-        if cart_clear:
-            st.session_state.cart = []
-            st.rerun()
-        
         # ပို့ပြီးပြီဆိုရင် ဒီ run မှာပဲ success box ပြ (မပြန်တင်လို့ အသံပါ ထွက်မယ်)
         if st.session_state.order_success:
             oi = st.session_state.order_success
@@ -2367,20 +2583,8 @@ def main():
             </script>
             """, height=0)
             # စာမျက်နှာ ပြန်တင်အောင် ထားရမယ် — နောက် run မှာ အပေါ်က block က Preparing/Complete ပြမယ်
-            st_autorefresh(interval=6000, limit=None, key="customer_cart_order_track")
-            st.markdown(f"""
-            <div style="background: linear-gradient(135deg, #28a745 0%, #20c997 100%); 
-                        padding: 25px; border-radius: 15px; text-align: center; margin: 20px 0;
-                        box-shadow: 0 4px 15px rgba(40, 167, 69, 0.3);">
-                <div style="display: flex; align-items: center; justify-content: center; gap: 10px; margin-bottom: 10px;">
-                    <span style="font-size: 1.8em;">✅</span>
-                    <span style="color: #fff; font-size: 1.5em; font-weight: bold;">Order ပို့ပြီးပါပြီ!</span>
-                </div>
-                <div style="color: #fff; font-size: 1em; opacity: 0.95; margin-top: 8px;">
-                    🪑 table: {oi['table_no']} &nbsp;&nbsp;&nbsp;&nbsp;|&nbsp;&nbsp;&nbsp;&nbsp; amount: {format_price(oi['total'])} Ks
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+            track_status = track_status or 'pending'
+            st.markdown(order_sent_box_html(oi['table_no'], oi['total']), unsafe_allow_html=True)
             if st.button("🍽️ ထပ်မှာမည်", use_container_width=True, type="primary", key="dismiss_order_btn"):
                 st.session_state.order_success = None
                 st.rerun()
@@ -2402,8 +2606,13 @@ def main():
             else:
                 st.info(f"🪑 စားပွဲနံပါတ်: **{st.session_state.table_no}**")
     
+    # Customer order tracking refresh - site တစ်ခုတည်း (status အလိုက် interval၊ ပြီးသွားရင် polling ရပ်)
+    refresh_ms = CUSTOMER_TRACK_REFRESH_MS.get(track_status)
+    if refresh_ms and is_customer:
+        st_autorefresh(interval=refresh_ms, limit=None, key="customer_order_track")
+    
     # Footer - only show for admin
-    if st.session_state.is_admin:
+    if not is_customer:
         st.divider()
         st.caption("📱 QR Menu & Order")
 